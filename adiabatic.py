@@ -0,0 +1,272 @@
+import numpy as np
+from schmidt import crankAngles, parameterMatrix
+
+# Columns of the matrix returned by 'adiabaticAnalysis'
+ADIABATIC_COLUMNS = ["degree", "rad", "V_c", "V_e", "P", "T_c", "T_e", "m_c", "m_e", "W_c", "W_e", "Q_k", "Q_r", "Q_h"]
+
+def _engine(parameters, gamma):
+    """
+    Converts engine configurations to SI-units.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    'gamma' Ratio of the specific heats of the gas
+    Output: 'engine' Dict of Numpy arrays of shape (N,)
+    """
+
+    values = parameterMatrix(parameters).T
+
+    V_cyl = values[5] * 1e-9        # [m^3]
+    V_c_avg = values[7] * 1e-9      # [m^3]
+    if np.any(V_c_avg <= V_cyl / 2):
+        raise ValueError("The average volume must be larger than half the swept volume, so that the working spaces never vanish.")
+
+    R = values[0]   # [J/kg*K]
+    T_h = 273.15 + values[2]    # [K]
+    T_r = 273.15 + values[3]    # [K]
+    T_k = 273.15 + values[4]    # [K]
+    V_reg = values[6] * 1e-9    # [m^3]
+
+    return {
+        'R': R,
+        'M': values[1],             # [kg]
+        'T_h': T_h,
+        'T_r': T_r,
+        'T_k': T_k,
+        'V_cyl': V_cyl,
+        'V_reg': V_reg,
+        'V_c_avg': V_c_avg,
+        'beta': np.radians(values[10]), # [rad]
+        'gamma': gamma,
+        'c_p': R * gamma / (gamma - 1), # [J/kg*K]
+        'c_v': R / (gamma - 1),         # [J/kg*K]
+        '1/T_h': 1 / T_h,
+        '1/T_k': 1 / T_k,
+        'gammaV_reg/T_r': gamma * V_reg / T_r,
+    }
+
+def _derivatives(state, volumes, engine, compressionInflow, expansionInflow):
+    """
+    Derivatives of the ideal adiabatic model with respect to the crank angle. The heater and the cooler have no volume.
+    The temperature of the gas crossing into a working space depends on the direction of the flow: gas flowing into
+    the compression space has the temperature of the cooler, gas flowing out of it the temperature of the space.
+    The temperatures do not depend on the mass of gas, so the steady state is found from the first two rows alone.
+    Input: 'state' Numpy array of shape (2, N) containing T_c, T_e [K], or of shape (7, N) which also contains
+    W_c, W_e, Q_k, Q_r, Q_h [J]
+    'volumes' Numpy array of shape (6, N) containing V_c, V_e [m^3], their derivatives [m^3/rad] and relative derivatives [1/rad]
+    'engine' Dict from '_engine'
+    'compressionInflow', 'expansionInflow' Boolean arrays, True where gas flows into the working space
+    Output: 'derivative' Numpy array with the shape of 'state'
+    'compressionInflow', 'expansionInflow' Boolean arrays of the directions of the flow at the state
+    """
+
+    T_c, T_e = state[0], state[1]
+    V_c, V_e, dV_c, dV_e, a_c, a_e = volumes
+    gamma = engine['gamma']
+
+    # The inverse temperatures of the gas crossing into the working spaces, 1/T_ck and 1/T_he
+    u_c = np.where(compressionInflow, engine['1/T_k'], 1 / T_c)
+    u_e = np.where(expansionInflow, engine['1/T_h'], 1 / T_e)
+
+    # Relative change of the pressure, dP/P, and of the mass in the working spaces, (dm/m) * (T_ck/T)
+    dP_P = -gamma * (dV_c * u_c + dV_e * u_e) / (V_c * u_c + engine['gammaV_reg/T_r'] + V_e * u_e)
+    g_c = a_c + dP_P / gamma
+    g_e = a_e + dP_P / gamma
+
+    derivative = np.empty_like(state)
+    derivative[0] = T_c * (dP_P + a_c - T_c * u_c * g_c)
+    derivative[1] = T_e * (dP_P + a_e - T_e * u_e * g_e)
+
+    if len(state) > 2:
+        R, T_k, T_h = engine['R'], engine['T_k'], engine['T_h']
+        P = engine['M'] * R / (V_c / T_c + engine['V_reg'] / engine['T_r'] + V_e / T_e)
+        dm_c = P * V_c * u_c * g_c / R
+        dm_e = P * V_e * u_e * g_e / R
+
+        # Mass flow from the compression space to the cooler and from the heater to the expansion space
+        gA_ck = -dm_c
+        gA_he = dm_e
+
+        derivative[2] = P * dV_c
+        derivative[3] = P * dV_e
+        derivative[4] = -engine['c_p'] * gA_ck * (1 / u_c - T_k)
+        derivative[5] = engine['V_reg'] * dP_P * P * engine['c_v'] / R - engine['c_p'] * (T_k * gA_ck - T_h * gA_he)
+        derivative[6] = -engine['c_p'] * gA_he * (T_h - 1 / u_e)
+
+    return derivative, g_c > 0, g_e > 0
+
+def _integrateCycle(state, engine, samples, substeps, record=False):
+    """
+    Integrates one cycle from 0 to 360 degrees with a fixed-step fourth-order Runge-Kutta method,
+    for all configurations at once.
+    Input: 'state' Numpy array of shape (2, N) or (7, N) at 0 degrees, see '_derivatives'
+    'engine' Dict from '_engine'
+    'samples' Number of recorded steps per cycle
+    'substeps' Number of integration steps per recorded step
+    'record' Boolean, also returns the state at every recorded step when True
+    Output: 'state' Numpy array with the shape of 'state' at 360 degrees
+    'history' Numpy array of shape (samples + 1, rows, N) containing the state at every recorded step, or None
+    """
+
+    steps = samples * substeps
+    h = 2 * np.pi / steps
+
+    # Volumes at every step and half step, shape (2 * steps + 1, 6, N)
+    theta = (np.arange(2 * steps + 1) * h / 2)[:, np.newaxis]
+    V_c = engine['V_c_avg'] + np.sin(theta) * engine['V_cyl'] / 2
+    V_e = engine['V_c_avg'] + np.sin(theta + engine['beta']) * engine['V_cyl'] / 2
+    dV_c = np.cos(theta) * engine['V_cyl'] / 2
+    dV_e = np.cos(theta + engine['beta']) * engine['V_cyl'] / 2
+    volumes = np.stack([V_c, V_e, dV_c, dV_e, dV_c / V_c, dV_e / V_e], axis=1)
+
+    state = state.copy()
+    history = np.empty((samples + 1,) + state.shape) if record else None
+
+    # The flow directions are those at the start of a step, so they do not switch between the stages
+    compressionInflow = dV_c[0] > 0
+    expansionInflow = dV_e[0] > 0
+
+    for step in range(steps):
+        j = 2 * step
+        k1, c, e = _derivatives(state, volumes[j], engine, compressionInflow, expansionInflow)
+
+        if np.any(c != compressionInflow) or np.any(e != expansionInflow):
+            compressionInflow, expansionInflow = c, e
+            k1 = _derivatives(state, volumes[j], engine, compressionInflow, expansionInflow)[0]
+
+        if record and step % substeps == 0:
+            history[step // substeps] = state
+
+        k2 = _derivatives(state + h / 2 * k1, volumes[j + 1], engine, compressionInflow, expansionInflow)[0]
+        k3 = _derivatives(state + h / 2 * k2, volumes[j + 1], engine, compressionInflow, expansionInflow)[0]
+        k4 = _derivatives(state + h * k3, volumes[j + 2], engine, compressionInflow, expansionInflow)[0]
+        state += h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    if record:
+        history[-1] = state
+
+    return state, history
+
+def _steadyState(temperatures, engine, samples, substeps, tolerance, maxCycles):
+    """
+    Integrates whole cycles of the temperatures of the working spaces until they repeat, extrapolating from every two
+    cycles with Aitken's delta-squared method.
+    Input: 'temperatures' Numpy array of shape (2, N) containing T_c and T_e at 0 degrees to start from [K]
+    'engine', 'samples', 'substeps' See '_integrateCycle'
+    'tolerance', 'maxCycles' See 'adiabaticAnalysisBatch'
+    Output: 'temperatures' Numpy array of shape (2, N) containing T_c and T_e at 0 degrees at steady state [K]
+    """
+
+    cycles = 0
+
+    while True:
+        first, _ = _integrateCycle(temperatures, engine, samples, substeps)
+        cycles += 1
+        if np.max(np.abs(first - temperatures)) < tolerance:
+            return first
+
+        second, _ = _integrateCycle(first, engine, samples, substeps)
+        cycles += 1
+        if np.max(np.abs(second - first)) < tolerance:
+            return second
+
+        if cycles >= maxCycles:
+            raise Exception("The adiabatic analysis did not reach a steady state within " + str(maxCycles) + " cycles.")
+
+        # Aitken's delta-squared extrapolation, falling back to the last cycle where it is not defined
+        denominator = second - 2 * first + temperatures
+        with np.errstate(divide='ignore', invalid='ignore'):
+            extrapolated = temperatures - (first - temperatures) ** 2 / denominator
+        temperatures = np.where((np.abs(denominator) > 1e-12) & (extrapolated > 0), extrapolated, second)
+
+def adiabaticAnalysis(values, resolution=10, samples=None, gamma=5/3, tolerance=1e-3, maxCycles=50, maxStep=10.0):
+    """
+    Performs an ideal adiabatic analysis and returns a matrix containing the results of the analysis.
+    Input: 'values' List of values used for calculation, see 'schmidt.schmidtAnalysis'
+    'resolution', 'samples' Crank-angle grid, see 'schmidt.crankAngles'
+    'gamma' Ratio of the specific heats of the gas, 5/3 for helium
+    'tolerance', 'maxCycles', 'maxStep' See 'adiabaticAnalysisBatch'
+    Output: 'cycleAnalysis' Matrix of results with one row per crank angle, see 'ADIABATIC_COLUMNS'
+    """
+
+    return adiabaticAnalysisBatch([values], resolution, samples, gamma, tolerance, maxCycles, maxStep)[0]
+
+def adiabaticAnalysisBatch(parameters, resolution=10, samples=None, gamma=5/3, tolerance=1e-3, maxCycles=50, maxStep=10.0):
+    """
+    Performs an ideal adiabatic analysis (Urieli and Berchowitz) of many engine configurations at once.
+    The working spaces are adiabatic, while the regenerator is isothermal at 'Tr' and the heater and cooler are
+    isothermal at 'Th' and 'Tc' with no volume. The volumes vary as in the Schmidt-analysis.
+    The temperatures of the working spaces at the start of the cycle are found by integrating whole cycles until they
+    repeat. Aitken's delta-squared method extrapolates from every two cycles to the steady state, which needs a few
+    cycles instead of dozens. The steady state is searched with steps of 'maxStep', and the recorded cycle is integrated
+    with the step of the crank angles, or 'maxStep' if that is larger. At finer resolutions, the search continues at the
+    fine step from there, which takes a few cycles more.
+    One configuration takes about 60 ms at a resolution of 10 degrees and 450 ms at 1 degree. Compared with a step of
+    0.25 degrees, the efficiency is off by about 3e-3 at 10 degrees, 8e-4 at 5 degrees and 2e-5 at 1 degree.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    'resolution' Step between two crank angles in degrees (e.g. 10, 1 or 0.1)
+    'samples' Number of steps per cycle. Overrides 'resolution' when given.
+    'gamma' Ratio of the specific heats of the gas, 5/3 for helium
+    'tolerance' Largest change of the temperatures over a cycle at steady state [K]
+    'maxCycles' Largest number of cycles of each search to integrate before giving up
+    'maxStep' Largest integration step in degrees. RK4 stays accurate with steps of several degrees.
+    Output: 'cycleAnalyses' Numpy array of shape (N, angles, 14), see 'ADIABATIC_COLUMNS'.
+    Work and heat are accumulated from 0 degrees, so the last row contains the values of the cycle.
+    """
+
+    engine = _engine(parameters, gamma)
+    degrees = crankAngles(resolution, samples)
+    samples = len(degrees) - 1
+    # The integration step follows the resolution, up to 'maxStep'
+    substeps = int(np.ceil(360 / samples / maxStep - 1e-9))
+
+    # Start from the temperatures of the Schmidt-analysis. At fine resolutions, the steady state is first searched with
+    # steps of 'maxStep', which leaves a few cycles at the fine step.
+    temperatures = np.stack([engine['T_k'], engine['T_h']])
+    searchSteps = int(np.ceil(360 / maxStep - 1e-9))
+    if searchSteps < samples * substeps:
+        temperatures = _steadyState(temperatures, engine, searchSteps, 1, tolerance, maxCycles)
+    temperatures = _steadyState(temperatures, engine, samples, substeps, tolerance, maxCycles)
+
+    # The work and heat are integrated over the last cycle only
+    state = np.zeros((7, temperatures.shape[1]))
+    state[:2] = temperatures
+    _, history = _integrateCycle(state, engine, samples, substeps, record=True)
+
+    T_c, T_e = history[:, 0], history[:, 1]
+    rad = np.radians(degrees)[:, np.newaxis]
+    V_c = engine['V_c_avg'] + np.sin(rad) * engine['V_cyl'] / 2
+    V_e = engine['V_c_avg'] + np.sin(rad + engine['beta']) * engine['V_cyl'] / 2
+    P = engine['M'] * engine['R'] / (V_c / T_c + engine['V_reg'] / engine['T_r'] + V_e / T_e)
+
+    cycleAnalyses = np.zeros((temperatures.shape[1], len(degrees), len(ADIABATIC_COLUMNS)))
+    cycleAnalyses[:,:,0] = degrees                                          # [degrees]
+    cycleAnalyses[:,:,1] = rad.T                                            # [rad]
+    cycleAnalyses[:,:,2] = V_c.T * 1e9                                      # [mm^3]
+    cycleAnalyses[:,:,3] = V_e.T * 1e9                                      # [mm^3]
+    cycleAnalyses[:,:,4] = P.T / 1e6                                        # [N/mm^2]
+    cycleAnalyses[:,:,5] = T_c.T - 273.15                                   # [C]
+    cycleAnalyses[:,:,6] = T_e.T - 273.15                                   # [C]
+    cycleAnalyses[:,:,7] = (P * V_c / (engine['R'] * T_c)).T                # [kg]
+    cycleAnalyses[:,:,8] = (P * V_e / (engine['R'] * T_e)).T                # [kg]
+    cycleAnalyses[:,:,9:14] = history[:, 2:7].transpose(2, 0, 1)            # [Nm], [J]
+
+    return cycleAnalyses
+
+def adiabaticPerformance(cycleAnalyses):
+    """
+    Summarizes the cycles of adiabatic analyses.
+    Input: 'cycleAnalyses' Matrix from 'adiabaticAnalysis' or array from 'adiabaticAnalysisBatch'
+    Output: 'performance' Dict containing the work, the heat of the cooler, regenerator and heater per cycle [J]
+    and the thermal efficiency, as floats or Numpy arrays of shape (N,)
+    """
+
+    cycle = np.asarray(cycleAnalyses)[..., -1, :]
+    W = cycle[..., 9] + cycle[..., 10]
+    Q_h = cycle[..., 13]
+
+    return {
+        'W': W,
+        'Q_k': cycle[..., 11],
+        'Q_r': cycle[..., 12],
+        'Q_h': Q_h,
+        'efficiency': W / Q_h,
+    }
@@ -6,6 +6,8 @@ import vtkmodules.vtkInteractionStyle
 # noinspection PyUnresolvedReferences
 import time
 import math
+from collections import deque
+import numpy as np
 import vtkmodules.vtkRenderingOpenGL2
 from vtkmodules.vtkCommonColor import vtkNamedColors
 from vtkmodules.vtkCommonCore import vtkPoints, vtkIdList, vtkUnsignedCharArray
@@ -18,17 +20,77 @@ from vtkmodules.vtkRenderingCore import (
     vtkRenderWindowInteractor,
     vtkRenderer
 )
-from PyQt5.QtCore import QUrl, QTimer, QObject, pyqtSignal, pyqtProperty
+from PyQt5.QtCore import QUrl, QTimer, QObject, Qt, pyqtSignal, pyqtProperty
 
 
+class KinematicsTable():
+    """
+    Precomputed positions and colour scales of the moving parts of a 'StirlingAnimation' for every crank angle of a cycle.
+    The values are stored in Numpy arrays indexed by 'index(degree)', so a lookup per frame is O(1)
+    and no trigonometry is evaluated while animating.
+    """
+    
+    def __init__(self, stirlingAnimation, resolution=1.0):
+        """
+        Args:
+            stirlingAnimation (StirlingAnimation): The animation whose geometry is used.
+            resolution (float): The step between two crank angles in degrees, e.g. 1 or 0.1.
+        """
+        
+        self.steps = int(round(360 / resolution))
+        self.stepsPerDegree = self.steps / 360
+        
+        rad = np.arange(self.steps) / self.stepsPerDegree * (2 * math.pi / 360)
+        sin = np.sin(rad)
+        
+        # Same expressions as 'calculateHeight', 'calculateColorScale', 'calculateHorizontalMovement' and 'calculateVerticalMovement'
+        self.height = sin * 75
+        self.colorScale = (sin + 1) * 0.5
+        self.negativeColorScale = (1 - sin) * 0.5
+        horizontalMovement = np.cos(rad) * 85
+        verticalMovement = np.sqrt(np.maximum(85 ** 2 - horizontalMovement ** 2, 0))
+        verticalMovement[sin < 0] *= -1
+        
+        horizontalCenter = stirlingAnimation.flywheelHorizontalCenter
+        verticalCenter = stirlingAnimation.flywheelVerticalCenter
+        
+        # Centres of the piston anchors on the flywheel, shape (steps, 2)
+        self.expansionAnchor = np.column_stack([horizontalMovement + horizontalCenter, verticalMovement + verticalCenter])
+        self.compressionAnchor = np.column_stack([- horizontalMovement + horizontalCenter, - verticalMovement + verticalCenter])
+        
+        # Corners of the piston rods, shape (steps, 4, 3)
+        self.expansionRod = self._rodVertices(90, self.height + stirlingAnimation.pistonHeight - 1, self.expansionAnchor)
+        self.compressionRod = self._rodVertices(340, - self.height + stirlingAnimation.pistonHeight - 1, self.compressionAnchor)
+        
+    def _rodVertices(self, pistonLeft, pistonEnd, anchor):
+        vertices = np.zeros((self.steps, 4, 3))
+        vertices[:, 0] = np.column_stack([np.full(self.steps, pistonLeft), pistonEnd, np.ones(self.steps)])
+        vertices[:, 1] = np.column_stack([np.full(self.steps, pistonLeft + 20), pistonEnd, np.ones(self.steps)])
+        vertices[:, 2, :2] = anchor + [10, 0]
+        vertices[:, 3, :2] = anchor - [10, 0]
+        return vertices
+        
+    def index(self, degree):
+        """Returns the index of the precomputed values nearest to a crank angle.
+
+        Args:
+            degree (float): The crank angle in degrees, also outside 0-360.
+
+        Returns:
+            int: The index into the arrays of the table.
+        """
+        
+        return int(round(degree * self.stepsPerDegree)) % self.steps
+
 class StirlingAnimation():
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, resolution=1.0, offScreen=False, window=True):
         self.offsetCenterAxis = 195
         self.flywheelHorizontalCenter = 225
         self.flywheelVerticalCenter = 675
         self.flywheelRadius = 120
         self.pistonHeight = self.offsetCenterAxis + 240
+        self.kinematics = KinematicsTable(self, resolution)
         
         degree = 0
         
@@ -173,8 +235,9 @@ class StirlingAnimation():
         rightPistonMapper.SetInputData(rightPistonPolydata)
         rightPistonMapper.Update()
         
-        expansionVolumeMapper = self.generateExpansionVolumeMapper(self.calculateHeight(degree), self.calculateColorScale(degree))    
-        compressionVolumeMapper = self.generateCompressionVolumeMapper(- self.calculateHeight(degree), self.calculateColorScale(-degree))
+        # The moving parts keep their pipelines, whose points and colours are updated in place by 'updateActors'
+        expansionVolumeMapper, self.expansionVolumePolydata = self.createVolumeMapper(10, 190, "Expansion colors")
+        compressionVolumeMapper, self.compressionVolumePolydata = self.createVolumeMapper(260, 440, "Compression colors")
         
         regeneratorMapper = vtkPolyDataMapper2D()
         regeneratorMapper.SetInputData(regeneratorPolydata)
@@ -229,28 +292,35 @@ class StirlingAnimation():
         self.flywheelCenterRadiusActor.GetProperty().SetColor(colors.GetColor3d('Black'))
         
         self.expansionPistonAnchorActor = vtkActor2D()
-        self.expansionPistonAnchorActor.SetMapper(self.generateExpansionPistonAnchorMapper(degree))
+        self.expansionPistonAnchorActor.SetMapper(self.createAnchorMapper())
         self.expansionPistonAnchorActor.GetProperty().SetColor(colors.GetColor3d('LightGrey'))
         
         self.compressionPistonAnchorActor = vtkActor2D()
-        self.compressionPistonAnchorActor.SetMapper(self.generateCompressionPistonAnchorMapper(degree))
+        self.compressionPistonAnchorActor.SetMapper(self.createAnchorMapper())
         self.compressionPistonAnchorActor.GetProperty().SetColor(colors.GetColor3d('LightGrey'))
         
         self.expansionPistonRodActor = vtkActor2D()
-        self.expansionPistonRodActor.SetMapper(self.generateExpansionPistonRodMapper(degree))
+        expansionPistonRodMapper, self.expansionPistonRodPolydata = self.createRodMapper()
+        self.expansionPistonRodActor.SetMapper(expansionPistonRodMapper)
         self.expansionPistonRodActor.GetProperty().SetColor(colors.GetColor3d('DarkSlateGray'))
         
         self.compressionPistonRodActor = vtkActor2D()
-        self.compressionPistonRodActor.SetMapper(self.generateCompressionPistonRodMapper(degree))
+        compressionPistonRodMapper, self.compressionPistonRodPolydata = self.createRodMapper()
+        self.compressionPistonRodActor.SetMapper(compressionPistonRodMapper)
         self.compressionPistonRodActor.GetProperty().SetColor(colors.GetColor3d('DarkSlateGray'))
         
         # Create a renderer, render window, and interactor
         self.renderer = vtkRenderer()
-        self.renderWindow = vtkRenderWindow()
-        self.renderWindow.AddRenderer(self.renderer)
-        self.renderWindow.SetWindowName("Stirling engine animation")
-        self.renderWindowInteractor = vtkRenderWindowInteractor()
-        self.renderWindowInteractor.SetRenderWindow(self.renderWindow)
+        
+        # Without 'window', the renderer is added to a render window of the caller, e.g. a 'QVTKRenderWindowInteractor'
+        self.renderWindow = None
+        self.renderWindowInteractor = None
+        if window:
+            self.renderWindow = vtkRenderWindow()
+            self.renderWindow.AddRenderer(self.renderer)
+            self.renderWindow.SetWindowName("Stirling engine animation")
+            self.renderWindowInteractor = vtkRenderWindowInteractor()
+            self.renderWindowInteractor.SetRenderWindow(self.renderWindow)
 
         # Add the actor to the scene
         self.renderer.AddActor(self.cylinderActor)
@@ -266,9 +336,14 @@ class StirlingAnimation():
         self.renderer.AddActor(self.expansionPistonAnchorActor)
         self.renderer.AddActor(self.compressionPistonRodActor)
         self.renderer.AddActor(self.compressionPistonAnchorActor)
-        self.renderWindow.SetSize(450, 800)
         self.renderer.SetBackground(colors.GetColor3d('White'))
-        self.renderWindow.SetWindowName('Animation of Stirling Engine')
+        if window:
+            self.renderWindow.SetSize(450, 800)
+            # Renders without a window, e.g. for benchmarks and exports on machines without a display
+            self.renderWindow.SetOffScreenRendering(offScreen)
+            self.renderWindow.SetWindowName('Animation of Stirling Engine')
+        
+        self.updateActors(degree)
 
         #self.renderWindowInteractor.Initialize()
 
@@ -279,34 +354,37 @@ class StirlingAnimation():
         # TODO Add input-values for 'degree' / 'degree' and potentially other values.
         # TODO Add descriptions and documentation
         
-        # w2if = vtkWindowToImageFilter()
-        # w2if.SetInput(renderWindow)
-        # w2if.Update()
-        # writer = vtkPNGWriter()
-        # writer.SetFileName('TestActor2D.png')
-        # writer.SetInputConnection(w2if.GetOutputPort())
-        # writer.Write()
-        
         # TODO Needed to display a single image. Maybe use 'start' and 'stop' to show?
         # Eventually just animate a single frame with a long sleep-function
         #self.renderWindowInteractor.Start()
         
     def animateStep(self, degree):
-            self.leftPistonActor.SetPosition([0, self.calculateHeight(degree)])
-            self.rightPistonActor.SetPosition([0, - self.calculateHeight(degree)])
-            
-            # TODO Add preloading of the next mapper and save it for hotswap
-            self.expansionVolumeActor.SetMapper(self.generateExpansionVolumeMapper(self.calculateHeight(degree) + 1, self.calculateColorScale(degree)))
-            self.compressionVolumeActor.SetMapper(self.generateCompressionVolumeMapper(- self.calculateHeight(degree) + 1, self.calculateColorScale(-degree)))
-            
-            self.expansionPistonAnchorActor.SetMapper(self.generateExpansionPistonAnchorMapper(degree))
-            self.compressionPistonAnchorActor.SetMapper(self.generateCompressionPistonAnchorMapper(degree))
-            
-            self.expansionPistonRodActor.SetMapper(self.generateExpansionPistonRodMapper(degree))
-            self.compressionPistonRodActor.SetMapper(self.generateCompressionPistonRodMapper(degree))
+            self.updateActors(degree)
             
             self.renderWindow.Render()
     
+    def updateActors(self, degree):
+        """Moves the pistons, anchors and rods and recolours the volumes for a crank angle, using the kinematics table.
+
+        Args:
+            degree (float): The crank angle in degrees.
+        """
+        
+        index = self.kinematics.index(degree)
+        height = self.kinematics.height[index]
+        
+        self.leftPistonActor.SetPosition([0, height])
+        self.rightPistonActor.SetPosition([0, - height])
+        
+        self.updateVolume(self.expansionVolumePolydata, 10, 190, height + 1, (255.0 * self.kinematics.colorScale[index], 0.0, 0.0))
+        self.updateVolume(self.compressionVolumePolydata, 260, 440, - height + 1, (0.0, 0.0, 255.0 * self.kinematics.negativeColorScale[index]))
+        
+        self.expansionPistonAnchorActor.SetPosition(self.kinematics.expansionAnchor[index])
+        self.compressionPistonAnchorActor.SetPosition(self.kinematics.compressionAnchor[index])
+        
+        self.updateRod(self.expansionPistonRodPolydata, self.kinematics.expansionRod[index])
+        self.updateRod(self.compressionPistonRodPolydata, self.kinematics.compressionRod[index])
+        
     def mkVtkIdList(self, it):
         """
         :param it: A python iterable.
@@ -332,148 +410,123 @@ class StirlingAnimation():
         else:
             return math.sqrt(85 ** 2 - self.calculateHorizontalMovement(degree, phaseShift) ** 2)
 
-    def generateExpansionVolumeMapper(self, expansionVolumeHeight, colorScale):
-        expansionVolumePoints = vtkPoints()
-        
-        expansionVolumeVertices = [(10, 110, 0), (190, 110, 0), (190, expansionVolumeHeight + self.offsetCenterAxis, 0),
-                                (10, expansionVolumeHeight + self.offsetCenterAxis, 0)]
-        
-        for point in expansionVolumeVertices:
-            expansionVolumePoints.InsertNextPoint(point)
-            
-        expansionVolumeFace = vtkCellArray()
-        expansionVolumeFaces = [(0, 1, 2, 3)]
-        
-        for face in expansionVolumeFaces:
-            expansionVolumeFace.InsertNextCell(self.mkVtkIdList(face))
-            
-        expansionColors = vtkUnsignedCharArray()
-        expansionColors.SetNumberOfComponents(3)
-        expansionColors.SetName("Expansion colors")
-        expansionColors.InsertNextTuple3(75.0, 0.0, 75.0)
-        expansionColors.InsertNextTuple3(75.0, 0.0, 75.0)
-        expansionColors.InsertNextTuple3(255.0 * colorScale, 0.0, 0.0)
-        expansionColors.InsertNextTuple3(255.0 * colorScale, 0.0, 0.0)
-        
-        expansionVolumePolydata = vtkPolyData()
-        expansionVolumePolydata.SetPoints(expansionVolumePoints)
-        expansionVolumePolydata.SetPolys(expansionVolumeFace)
-        expansionVolumePolydata.GetPointData().SetScalars(expansionColors)
-        
-        expansionVolumeMapper = vtkPolyDataMapper2D()
-        expansionVolumeMapper.SetInputData(expansionVolumePolydata)
-        expansionVolumeMapper.Update()
-        
-        return expansionVolumeMapper
+    def createVolumeMapper(self, left, right, name):
+        """Creates the mapper of a gas volume between the cylinder head and a piston.
+
+        Args:
+            left (float): The horizontal position of the left side of the volume.
+            right (float): The horizontal position of the right side of the volume.
+            name (str): The name of the colour array.
+
+        Returns:
+            tuple: The mapper and the polydata, whose top edge and colour are set by 'updateVolume'.
+        """
         
-    def generateCompressionVolumeMapper(self, compressionVolumeHeight, colorScale):
-        compressionVolumePoints = vtkPoints()
+        volumePoints = vtkPoints()
         
-        compressionVolumeVertices = [(260, 110, 0), (440, 110, 0), (440, compressionVolumeHeight + self.offsetCenterAxis, 0),
-                                (260, compressionVolumeHeight + self.offsetCenterAxis, 0)]
+        volumeVertices = [(left, 110, 0), (right, 110, 0), (right, self.offsetCenterAxis, 0), (left, self.offsetCenterAxis, 0)]
         
-        for point in compressionVolumeVertices:
-            compressionVolumePoints.InsertNextPoint(point)
+        for point in volumeVertices:
+            volumePoints.InsertNextPoint(point)
             
-        compressionVolumeFace = vtkCellArray()
-        compressionVolumeFaces = [(0, 1, 2, 3)]
-        
-        for face in compressionVolumeFaces:
-            compressionVolumeFace.InsertNextCell(self.mkVtkIdList(face))
+        volumeFace = vtkCellArray()
+        volumeFace.InsertNextCell(self.mkVtkIdList((0, 1, 2, 3)))
             
-        compressionColors = vtkUnsignedCharArray()
-        compressionColors.SetNumberOfComponents(3)
-        compressionColors.SetName("Compression colors")
-        compressionColors.InsertNextTuple3(75.0, 0.0, 75.0)
-        compressionColors.InsertNextTuple3(75.0, 0.0, 75.0)
-        compressionColors.InsertNextTuple3(0.0, 0.0, 255.0 * colorScale)
-        compressionColors.InsertNextTuple3(0.0, 0.0, 255.0 * colorScale)
+        volumeColors = vtkUnsignedCharArray()
+        volumeColors.SetNumberOfComponents(3)
+        volumeColors.SetName(name)
+        volumeColors.InsertNextTuple3(75.0, 0.0, 75.0)
+        volumeColors.InsertNextTuple3(75.0, 0.0, 75.0)
+        volumeColors.InsertNextTuple3(0.0, 0.0, 0.0)
+        volumeColors.InsertNextTuple3(0.0, 0.0, 0.0)
+        
+        volumePolydata = vtkPolyData()
+        volumePolydata.SetPoints(volumePoints)
+        volumePolydata.SetPolys(volumeFace)
+        volumePolydata.GetPointData().SetScalars(volumeColors)
+        
+        volumeMapper = vtkPolyDataMapper2D()
+        volumeMapper.SetInputData(volumePolydata)
+        
+        return volumeMapper, volumePolydata
+    
+    def updateVolume(self, volumePolydata, left, right, height, color):
+        """Moves the top edge of a gas volume and sets its colour in place.
+
+        Args:
+            volumePolydata (vtkPolyData): The polydata from 'createVolumeMapper'.
+            left (float): The horizontal position of the left side of the volume.
+            right (float): The horizontal position of the right side of the volume.
+            height (float): The offset of the piston from the centre axis.
+            color (tuple): The RGB-colour of the top edge.
+        """
         
-        compressionVolumePolydata = vtkPolyData()
-        compressionVolumePolydata.SetPoints(compressionVolumePoints)
-        compressionVolumePolydata.SetPolys(compressionVolumeFace)
-        compressionVolumePolydata.GetPointData().SetScalars(compressionColors)
+        volumePoints = volumePolydata.GetPoints()
+        volumePoints.SetPoint(2, right, height + self.offsetCenterAxis, 0)
+        volumePoints.SetPoint(3, left, height + self.offsetCenterAxis, 0)
+        volumePoints.Modified()
         
-        compressionVolumeMapper = vtkPolyDataMapper2D()
-        compressionVolumeMapper.SetInputData(compressionVolumePolydata)
-        compressionVolumeMapper.Update()
+        volumeColors = volumePolydata.GetPointData().GetScalars()
+        volumeColors.SetTuple3(2, *color)
+        volumeColors.SetTuple3(3, *color)
+        volumeColors.Modified()
         
-        return compressionVolumeMapper
+        volumePolydata.Modified()
 
-    def generateExpansionPistonAnchorMapper(self, degree):
-        expansionPistonAnchorSource = vtkRegularPolygonSource()
-        expansionPistonAnchorSource.SetNumberOfSides(50)
-        expansionPistonAnchorSource.SetRadius(15.0)
+    def createAnchorMapper(self):
+        """Creates the mapper of a piston anchor centred at the origin. The anchor is moved with the position of its actor.
+
+        Returns:
+            vtkPolyDataMapper2D: The mapper of the anchor.
+        """
         
-        expansionPistonAnchorSource.SetCenter(self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter, self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0.0)
+        pistonAnchorSource = vtkRegularPolygonSource()
+        pistonAnchorSource.SetNumberOfSides(50)
+        pistonAnchorSource.SetRadius(15.0)
+        pistonAnchorSource.SetCenter(0.0, 0.0, 0.0)
         
-        expansionPistonAnchorMapper = vtkPolyDataMapper2D()
-        expansionPistonAnchorMapper.SetInputConnection(expansionPistonAnchorSource.GetOutputPort())
+        pistonAnchorMapper = vtkPolyDataMapper2D()
+        pistonAnchorMapper.SetInputConnection(pistonAnchorSource.GetOutputPort())
         
-        return expansionPistonAnchorMapper
+        return pistonAnchorMapper
 
-    def generateCompressionPistonAnchorMapper(self, degree):
-        compressionPistonAnchorSource = vtkRegularPolygonSource()
-        compressionPistonAnchorSource.SetNumberOfSides(50)
-        compressionPistonAnchorSource.SetRadius(15.0)
-        compressionPistonAnchorSource.SetCenter(- self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter, - self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0.0)
-        
-        compressionPistonAnchorMapper = vtkPolyDataMapper2D()
-        compressionPistonAnchorMapper.SetInputConnection(compressionPistonAnchorSource.GetOutputPort())
-        
-        return compressionPistonAnchorMapper
+    def createRodMapper(self):
+        """Creates the mapper of a piston rod.
 
-    def generateExpansionPistonRodMapper(self, degree):
-        expansionPistonRodPoints = vtkPoints()
-        
-        expansionPistonRodVertices = [(90, self.calculateHeight(degree) + self.pistonHeight - 1, 1), (110, self.calculateHeight(degree) + self.pistonHeight - 1, 1),
-                                    (self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter + 10, self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0),
-                                    (self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter - 10, self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0)]
+        Returns:
+            tuple: The mapper and the polydata, whose corners are set by 'updateRod'.
+        """
         
-        for point in expansionPistonRodVertices:
-            expansionPistonRodPoints.InsertNextPoint(point)
+        pistonRodPoints = vtkPoints()
+        pistonRodPoints.SetNumberOfPoints(4)
             
-        expansionPistonRodFace = vtkCellArray()
-        expansionPistonRodFaces = [(0, 1, 2, 3)]
-        
-        for face in expansionPistonRodFaces:
-            expansionPistonRodFace.InsertNextCell(self.mkVtkIdList(face))
+        pistonRodFace = vtkCellArray()
+        pistonRodFace.InsertNextCell(self.mkVtkIdList((0, 1, 2, 3)))
         
-        expansionPistonRodPolydata = vtkPolyData()
-        expansionPistonRodPolydata.SetPoints(expansionPistonRodPoints)
-        expansionPistonRodPolydata.SetPolys(expansionPistonRodFace)
+        pistonRodPolydata = vtkPolyData()
+        pistonRodPolydata.SetPoints(pistonRodPoints)
+        pistonRodPolydata.SetPolys(pistonRodFace)
         
-        expansionPistonRodMapper = vtkPolyDataMapper2D()
-        expansionPistonRodMapper.SetInputData(expansionPistonRodPolydata)
-        expansionPistonRodMapper.Update()
+        pistonRodMapper = vtkPolyDataMapper2D()
+        pistonRodMapper.SetInputData(pistonRodPolydata)
         
-        return expansionPistonRodMapper
+        return pistonRodMapper, pistonRodPolydata
 
-    def generateCompressionPistonRodMapper(self, degree):
-        compressionPistonRodPoints = vtkPoints()
-        
-        compressionPistonRodVertices = [(340, - self.calculateHeight(degree) + self.pistonHeight - 1, 1), (360, - self.calculateHeight(degree) + self.pistonHeight - 1, 1),
-                                    (- self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter + 10, - self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0),
-                                    (- self.calculateHorizontalMovement(degree) + self.flywheelHorizontalCenter - 10, - self.calculateVerticalMovement(degree) + self.flywheelVerticalCenter, 0)]
-        
-        for point in compressionPistonRodVertices:
-            compressionPistonRodPoints.InsertNextPoint(point)
-            
-        compressionPistonRodFace = vtkCellArray()
-        compressionPistonRodFaces = [(0, 1, 2, 3)]
-        
-        for face in compressionPistonRodFaces:
-            compressionPistonRodFace.InsertNextCell(self.mkVtkIdList(face))
+    def updateRod(self, pistonRodPolydata, vertices):
+        """Moves the corners of a piston rod in place.
+
+        Args:
+            pistonRodPolydata (vtkPolyData): The polydata from 'createRodMapper'.
+            vertices (numpy.ndarray): The four corners of the rod from the kinematics table.
+        """
         
-        compressionPistonRodPolydata = vtkPolyData()
-        compressionPistonRodPolydata.SetPoints(compressionPistonRodPoints)
-        compressionPistonRodPolydata.SetPolys(compressionPistonRodFace)
+        pistonRodPoints = pistonRodPolydata.GetPoints()
         
-        compressionPistonRodMapper = vtkPolyDataMapper2D()
-        compressionPistonRodMapper.SetInputData(compressionPistonRodPolydata)
-        compressionPistonRodMapper.Update()
+        for i, point in enumerate(vertices):
+            pistonRodPoints.SetPoint(i, point)
         
-        return compressionPistonRodMapper
+        pistonRodPoints.Modified()
+        pistonRodPolydata.Modified()
     
     def getActors(self):
         actorList = []
@@ -553,19 +606,131 @@ class ActorTroup(QObject):
             self.valueChanged.emit(degree)
             
     def updateActors(self, degree):
-        self.leftPistonActor.SetPosition([0, self.stirlingAnimation.calculateHeight(degree)])
-        self.rightPistonActor.SetPosition([0, - self.stirlingAnimation.calculateHeight(degree)])
+        self.stirlingAnimation.updateActors(degree)
         
-        self.expansionVolumeActor.SetMapper(self.stirlingAnimation.generateExpansionVolumeMapper(self.stirlingAnimation.calculateHeight(degree) + 1, self.stirlingAnimation.calculateColorScale(degree)))
-        self.compressionVolumeActor.SetMapper(self.stirlingAnimation.generateCompressionVolumeMapper(- self.stirlingAnimation.calculateHeight(degree) + 1, self.stirlingAnimation.calculateColorScale(-degree)))
+        print("Degree: " + str(degree))
+
+class FrameScheduler(QObject):
+    """
+    Drives an animation at a target frame rate. The crank angle of each frame is calculated from the wall-clock time,
+    so the speed of the engine does not depend on how long a frame takes to render. Frames that are not rendered in time
+    are skipped and counted. The timer only runs while the animation is playing, so a paused animation uses no CPU.
+    """
+    
+    frame = pyqtSignal(float)
+    
+    def __init__(self, targetFps=30, cycleDuration=10000, parent=None):
+        """
+        Args:
+            targetFps (float): The number of frames per second to aim for.
+            cycleDuration (int): The duration of one revolution in milliseconds.
+            parent (QObject): The parent of the scheduler.
+        """
         
-        self.expansionPistonAnchorActor.SetMapper(self.stirlingAnimation.generateExpansionPistonAnchorMapper(degree))
-        self.compressionPistonAnchorActor.SetMapper(self.stirlingAnimation.generateCompressionPistonAnchorMapper(degree))
+        super().__init__(parent)
+        self.cycleDuration = cycleDuration
+        self.droppedFrames = 0
+        self.frames = 0
+        self._startDegree = 0.0
+        self._startTime = time.perf_counter()
+        self._lastFrameNumber = 0
+        self._frameTimes = deque(maxlen=120)
+        
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.setTargetFps(targetFps)
+        
+    def setTargetFps(self, targetFps):
+        self.targetFps = targetFps
+        self.timer.setInterval(max(1, int(round(1000 / targetFps))))
+        self._rebase()
+        
+    def setCycleDuration(self, cycleDuration):
+        """Changes the speed of the engine without a jump in the crank angle.
+
+        Args:
+            cycleDuration (int): The duration of one revolution in milliseconds.
+        """
         
-        self.expansionPistonRodActor.SetMapper(self.stirlingAnimation.generateExpansionPistonRodMapper(degree))
-        self.compressionPistonRodActor.SetMapper(self.stirlingAnimation.generateCompressionPistonRodMapper(degree))
+        self._rebase()
+        self.cycleDuration = cycleDuration
         
-        print("Degree: " + str(degree))
+    def currentDegree(self):
+        """Returns the crank angle at the current time.
+
+        Returns:
+            float: The crank angle in degrees, 0-360.
+        """
+        
+        if not self.timer.isActive():
+            return self._startDegree
+        
+        elapsed = time.perf_counter() - self._startTime
+        return (self._startDegree + elapsed * 1000 / self.cycleDuration * 360) % 360
+        
+    def start(self, degree=None):
+        """Starts or resumes the animation.
+
+        Args:
+            degree (float): The crank angle to start from. Defaults to where the animation was paused.
+        """
+        
+        if degree is not None:
+            self._startDegree = degree
+        self._startTime = time.perf_counter()
+        self._lastFrameNumber = 0
+        self._frameTimes.clear()
+        self.timer.start()
+        
+    def pause(self):
+        self._startDegree = self.currentDegree()
+        self.timer.stop()
+        
+    def stop(self):
+        self.pause()
+        
+    def isActive(self):
+        return self.timer.isActive()
+        
+    def tick(self):
+        now = time.perf_counter()
+        
+        # Every interval that passed since the last frame without a tick is a dropped frame
+        frameNumber = int((now - self._startTime) * self.targetFps)
+        self.droppedFrames += max(0, frameNumber - self._lastFrameNumber - 1)
+        self._lastFrameNumber = frameNumber
+        
+        self.frames += 1
+        self._frameTimes.append(now)
+        self.frame.emit(self.currentDegree())
+        
+    def achievedFps(self):
+        """Returns the frame rate of the latest frames.
+
+        Returns:
+            float: The number of frames per second.
+        """
+        
+        if len(self._frameTimes) < 2:
+            return 0.0
+        
+        return (len(self._frameTimes) - 1) / (self._frameTimes[-1] - self._frameTimes[0])
+        
+    def statistics(self):
+        return {
+            'targetFps': self.targetFps,
+            'achievedFps': self.achievedFps(),
+            'frames': self.frames,
+            'droppedFrames': self.droppedFrames,
+        }
+    
+    def _rebase(self):
+        # Continues from the current crank angle, so that changing the speed or frame rate does not make the engine jump
+        if self.timer.isActive():
+            self._startDegree = self.currentDegree()
+            self._startTime = time.perf_counter()
+            self._lastFrameNumber = 0
 
 if __name__ == '__main__':
     stirlingClass = StirlingAnimation()
@@ -0,0 +1,139 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from filemanager import checkValues, readFromJSON, writeResultsToCSV
+from schmidt import schmidtAnalysis, plotSchmidtAnalysis
+
+def findEngineDefinitions(inputs):
+    """
+    Returns the JSON-files given by a list of files, directories and glob-patterns.
+    Input: 'inputs' List of strings. Directories are searched for '.json'-files.
+    Output: 'fileNames' Sorted list of paths without duplicates. Paths to the same file, e.g. 'a.json' and './a.json',
+    count as one, and the first given is kept.
+    """
+
+    paths = []
+
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.json"))))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(path for path in glob.glob(item) if os.path.isfile(path)))
+
+    fileNames = {}
+    for path in paths:
+        fileNames.setdefault(os.path.realpath(path), path)
+
+    return sorted(fileNames.values())
+
+def resultFileNames(fileNames):
+    """
+    Names the results of engine definitions after their paths relative to the directory containing all of them,
+    e.g. 'a/engine.json' and 'b/engine.json' give 'a/engine' and 'b/engine', so that definitions with the same name
+    in different directories do not overwrite each other's results.
+    Input: 'fileNames' List of paths to JSON-files
+    Output: 'resultFileNames' Dict mapping each path to the name of its results, without extension
+    """
+
+    if not fileNames:
+        return {}
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(fileName)) for fileName in fileNames])
+    names = {fileName: os.path.splitext(os.path.relpath(os.path.abspath(fileName), root))[0] for fileName in fileNames}
+
+    # Definitions differing only in their extension, or in case on some systems, would still share their results
+    paths = {}
+    for fileName, name in names.items():
+        paths.setdefault(os.path.normcase(name), []).append(fileName)
+    collisions = [", ".join(sorted(group)) for group in paths.values() if len(group) > 1]
+    if collisions:
+        raise Exception("The results of these engine definitions would overwrite each other: " + "; ".join(collisions))
+
+    return names
+
+def processEngineDefinition(fileName, resultDirectory, resolution=10, resultFileName=None):
+    """
+    Runs a Schmidt-analysis for one engine definition and writes the results as a CSV- and PDF-file named after it.
+    Input: 'fileName' String containing the path to a JSON-file in the format of 'assets/default.json'
+    'resultDirectory' String containing the directory of the results
+    'resolution' Step between two crank angles in degrees
+    'resultFileName' String containing the name of the results without extension, see 'resultFileNames'.
+    Defaults to the name of the definition.
+    Output: 'resultFileName' String containing the name of the results, without path or extension
+    """
+
+    values = readFromJSON(fileName)
+
+    if not checkValues(values):
+        raise ValueError("The engine definition in '" + fileName + "' contains missing or negative values.")
+
+    if resultFileName is None:
+        resultFileName = os.path.splitext(os.path.basename(fileName))[0]
+    os.makedirs(os.path.join(resultDirectory, os.path.dirname(resultFileName)), exist_ok=True)
+    cycleAnalysis = schmidtAnalysis(values, resolution)
+
+    plotSchmidtAnalysis(resultFileName, cycleAnalysis, resultDirectory)
+    writeResultsToCSV(resultFileName, cycleAnalysis, resultDirectory)
+
+    return resultFileName
+
+def runBatch(fileNames, resultDirectory="results", resolution=10, workers=None):
+    """
+    Processes engine definitions in parallel. A failing definition does not stop the others.
+    The results are named by 'resultFileNames', which fails before any definition is processed if two would collide.
+    Input: 'fileNames' List of paths to JSON-files
+    'resultDirectory' String containing the directory of the results
+    'resolution' Step between two crank angles in degrees
+    'workers' Number of worker processes. Defaults to the number of cores.
+    Output: 'failures' Dict mapping the paths that failed to their error messages
+    """
+
+    names = resultFileNames(fileNames)
+    os.makedirs(resultDirectory, exist_ok=True)
+    failures = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(processEngineDefinition, fileName, resultDirectory, resolution, names[fileName]): fileName
+                   for fileName in fileNames}
+
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as exception:
+                failures[futures[future]] = str(exception)
+                print("Could not process '" + futures[future] + "': " + str(exception))
+
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes CSV- and PDF-reports of a Schmidt-analysis for every engine definition, without starting the GUI.")
+    parser.add_argument("inputs", nargs="+", help="JSON-files, directories or glob-patterns of engine definitions")
+    parser.add_argument("-o", "--output", default="results", help="directory for the reports (default: results)")
+    parser.add_argument("-d", "--resolution", type=float, default=10, help="crank-angle step in degrees (default: 10)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    arguments = parser.parse_args(argv)
+
+    fileNames = findEngineDefinitions(arguments.inputs)
+    if not fileNames:
+        print("No engine definitions were found.")
+        return 1
+
+    startTime = time.perf_counter()
+    try:
+        failures = runBatch(fileNames, arguments.output, arguments.resolution, arguments.workers)
+    except Exception as exception:
+        print(str(exception))
+        return 1
+
+    print("Processed " + str(len(fileNames) - len(failures)) + " of " + str(len(fileNames)) + " engine definitions in "
+          + str(round(time.perf_counter() - startTime, 2)) + " s.")
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
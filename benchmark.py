@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+def frameStatistics(frameTimes):
+    """
+    Summarizes the duration of a series of frames.
+    Input: 'frameTimes' List of frame durations [s]
+    Output: 'statistics' Dict containing the frames per second and the 50th, 95th and 99th percentile of the frame time [ms]
+    """
+
+    frameTimes = np.asarray(frameTimes) * 1000
+
+    return {
+        'frames': len(frameTimes),
+        'fps': float(1000 * len(frameTimes) / frameTimes.sum()),
+        'p50': float(np.percentile(frameTimes, 50)),
+        'p95': float(np.percentile(frameTimes, 95)),
+        'p99': float(np.percentile(frameTimes, 99)),
+        'max': float(frameTimes.max()),
+    }
+
+def measureAllocations(drawFrame, degrees):
+    """
+    Measures the Python memory allocated by drawing frames, using 'tracemalloc'.
+    Runs separately from the timing, since tracing slows every allocation down.
+    Input: 'drawFrame' Function drawing the frame of a degree
+    'degrees' Numpy array of the degrees to draw
+    Output: 'allocations' Dict containing the bytes allocated during a frame and the blocks and bytes retained per frame
+    """
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    allocatedBytes = []
+
+    for degree in degrees:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        drawFrame(degree)
+        _, peak = tracemalloc.get_traced_memory()
+        allocatedBytes.append(peak - current)
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = after.compare_to(before, 'filename')
+
+    return {
+        'allocatedBytesPerFrame': float(np.mean(allocatedBytes)),
+        'retainedBlocksPerFrame': sum(statistic.count_diff for statistic in retained) / len(degrees),
+        'retainedBytesPerFrame': sum(statistic.size_diff for statistic in retained) / len(degrees),
+    }
+
+def benchmarkAnimation(cycles=3, step=1.0):
+    """
+    Drives 'StirlingAnimation' through full cycles in an offscreen render window, without a Qt-application.
+    Input: 'cycles' Number of revolutions
+    'step' Crank-angle step between frames in degrees
+    Output: 'results' Dict containing the frame statistics and allocations
+    """
+
+    from animation import StirlingAnimation
+
+    stirlingAnimation = StirlingAnimation(resolution=min(step, 1.0), offScreen=True)
+    degrees = np.arange(0, 360 * cycles, step)
+
+    # The first render compiles the shaders
+    stirlingAnimation.animateStep(0)
+
+    frameTimes = []
+    for degree in degrees:
+        start = time.perf_counter()
+        stirlingAnimation.animateStep(degree)
+        frameTimes.append(time.perf_counter() - start)
+
+    results = frameStatistics(frameTimes)
+    results.update(measureAllocations(stirlingAnimation.animateStep, degrees[:int(360 / step)]))
+
+    return results
+
+def benchmarkStateWindow(cycles=3, step=1.0):
+    """
+    Drives the update path of 'StateWindow' through full cycles with the offscreen Qt-platform.
+    Each frame sets the degree and processes the events until the frame is rendered.
+    Input: 'cycles' Number of revolutions
+    'step' Crank-angle step between frames in degrees
+    Output: 'results' Dict containing the frame statistics, allocations and renders per frame
+    """
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    from main import StateWindow
+    from filemanager import readFromJSON
+    from session import EngineParameters, Session
+
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+    window = StateWindow(session=Session(EngineParameters.fromValues(readFromJSON("assets/default.json"))))
+    window.show()
+    window.animation.pause()
+    application.processEvents()
+
+    def drawFrame(degree):
+        window.setDegree(degree)
+        application.processEvents()
+
+    degrees = np.arange(step, 360 * cycles + step, step)
+    window.frameCount = 0
+    window.renderCount = 0
+
+    frameTimes = []
+    for degree in degrees:
+        start = time.perf_counter()
+        drawFrame(degree)
+        frameTimes.append(time.perf_counter() - start)
+
+    results = frameStatistics(frameTimes)
+    results['rendersPerFrame'] = window.rendersPerFrame()
+    results.update(measureAllocations(drawFrame, degrees[:int(360 / step)] + 0.5 * step))
+
+    window.close()
+
+    return results
+
+def residentMemory():
+    """
+    Output: 'bytes' Resident memory of the process, including the memory allocated by Qt, VTK and OpenGL
+    """
+
+    try:
+        with open("/proc/self/status") as statusFile:
+            for line in statusFile:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    import resource
+
+    # The peak resident memory, in kB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def benchmarkNavigation(rounds=10, timeout=60):
+    """
+    Navigates Intro -> StateWindow -> ResultWindow -> StateWindow -> Intro repeatedly with the offscreen Qt-platform
+    and records the resident memory and the number of top-level windows after each round.
+    Input: 'rounds' Number of round trips
+    'timeout' Seconds to wait for the report of a 'ResultWindow'
+    Output: 'results' Dict containing the memory and windows after each round and the memory growth per round
+    """
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    from main import Intro, windowPool
+
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+
+    def waitFor(condition):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise Exception("The report was not finished within " + str(timeout) + " s.")
+            application.processEvents()
+            time.sleep(0.01)
+
+    intro = windowPool.get(Intro)
+    intro.show()
+    application.processEvents()
+
+    memory = []
+    windows = []
+    for _ in range(rounds + 1):
+        intro.useDefaultValues()
+        application.processEvents()
+        stateWindow = intro.stateVisualization
+        stateWindow.continueToResults()
+        resultWindow = stateWindow.results
+        waitFor(lambda: not resultWindow.cancelButton.isEnabled())
+        resultWindow.returnToStateVisualization()
+        application.processEvents()
+        stateWindow.returnToIntro()
+        intro = stateWindow.intro
+        application.processEvents()
+
+        memory.append(residentMemory())
+        windows.append(len(application.topLevelWidgets()))
+
+    windowPool.close()
+
+    # The first round creates the windows, the following rounds show whether navigating accumulates memory
+    return {
+        'rounds': rounds,
+        'residentBytes': memory,
+        'topLevelWindows': windows,
+        'growthBytesPerRound': (memory[-1] - memory[0]) / max(1, rounds),
+    }
+
+def measureStartup(command, runs=5, timeout=120):
+    """
+    Measures the time from launching the application to the first paint of 'Intro'. The application is started with
+    the environment variable 'STIRLING_STARTUP_BENCHMARK', which makes it print 'First paint' and quit.
+    Input: 'command' List of strings, e.g. [sys.executable, 'main.py'] or ['dist/main']
+    'runs' Number of launches. The first launch is reported separately, since the files are not cached by the system yet.
+    'timeout' Seconds to wait for the first paint
+    Output: 'results' Dict containing the first and the median, minimum and maximum of the following launches [s]
+    """
+
+    environment = dict(os.environ, STIRLING_STARTUP_BENCHMARK="1")
+    environment.setdefault("QT_QPA_PLATFORM", "offscreen")
+    startupTimes = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=environment, text=True)
+
+        try:
+            for line in process.stdout:
+                if line.startswith("First paint"):
+                    startupTimes.append(time.perf_counter() - start)
+                    break
+            else:
+                raise Exception("The application exited without painting 'Intro': " + " ".join(command))
+            process.wait(timeout=timeout)
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+    following = startupTimes[1:] or startupTimes
+
+    return {
+        'command': command,
+        'first': startupTimes[0],
+        'median': float(np.median(following)),
+        'min': float(np.min(following)),
+        'max': float(np.max(following)),
+    }
+
+def benchmarkStartup(runs=5, executable=None):
+    """
+    Measures the time to the first paint of 'Intro' from source and, if it is built, from the PyInstaller-bundle of 'main.spec'.
+    Input: 'runs' Number of launches of each
+    'executable' String containing the path of the bundle. Defaults to 'dist/main', the output of 'pyinstaller main.spec'.
+    Output: 'results' Dict containing the results of 'measureStartup' for 'source' and 'bundle'
+    """
+
+    results = {'source': measureStartup([sys.executable, "main.py"], runs)}
+
+    if executable is None:
+        executable = os.path.join("dist", "main.exe" if sys.platform == "win32" else "main")
+
+    if os.path.exists(executable):
+        results['bundle'] = measureStartup([os.path.abspath(executable)], runs)
+    else:
+        print("The bundle was not measured, since '" + executable + "' does not exist. Build it with 'pyinstaller main.spec'.")
+
+    return results
+
+def writeResults(results, filePath):
+    os.makedirs(os.path.dirname(filePath) or ".", exist_ok=True)
+    with open(filePath, 'w') as resultFile:
+        json.dump(results, resultFile, indent=4)
+    print("The results are saved in: " + filePath)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the animation offscreen and writes the results as JSON.")
+    parser.add_argument("-n", "--cycles", type=int, default=3, help="number of revolutions (default: 3)")
+    parser.add_argument("-s", "--step", type=float, default=1.0, help="crank-angle step between frames in degrees (default: 1)")
+    parser.add_argument("-o", "--output", default=None, help="JSON-file for the results (default: results/benchmark.json, results/startup.json or results/navigation.json)")
+    parser.add_argument("--skip-window", action="store_true", help="only benchmark 'StirlingAnimation', not 'StateWindow'")
+    parser.add_argument("--startup", action="store_true", help="only benchmark the time to the first paint of 'Intro'")
+    parser.add_argument("--runs", type=int, default=5, help="number of launches for '--startup' (default: 5)")
+    parser.add_argument("--executable", default=None, help="PyInstaller-bundle for '--startup' (default: dist/main)")
+    parser.add_argument("--navigation", action="store_true", help="only benchmark the memory of navigating between the windows")
+    parser.add_argument("--rounds", type=int, default=10, help="number of round trips for '--navigation' (default: 10)")
+    arguments = parser.parse_args(argv)
+
+    if arguments.navigation:
+        results = {
+            'machine': {'platform': platform.platform(), 'processor': platform.processor(), 'python': platform.python_version()},
+            'navigation': benchmarkNavigation(max(1, arguments.rounds)),
+        }
+
+        statistics = results['navigation']
+        print("navigation: " + str(round(statistics['growthBytesPerRound'] / 1024)) + " kB resident memory growth per round, "
+              + str(statistics['topLevelWindows'][-1]) + " top-level windows after " + str(statistics['rounds']) + " rounds")
+
+        return writeResults(results, arguments.output or "results/navigation.json")
+
+    if arguments.startup:
+        results = {
+            'machine': {'platform': platform.platform(), 'processor': platform.processor(), 'python': platform.python_version()},
+            'startup': benchmarkStartup(max(1, arguments.runs), arguments.executable),
+        }
+
+        for name, statistics in results['startup'].items():
+            print(name + ": first paint after " + str(round(statistics['first'], 2)) + " s on the first launch, "
+                  + str(round(statistics['median'], 2)) + " s median of the following launches")
+
+        return writeResults(results, arguments.output or "results/startup.json")
+
+    results = {
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(), 'python': platform.python_version()},
+        'cycles': arguments.cycles,
+        'step': arguments.step,
+        'animation': benchmarkAnimation(arguments.cycles, arguments.step),
+    }
+
+    if not arguments.skip_window:
+        results['stateWindow'] = benchmarkStateWindow(arguments.cycles, arguments.step)
+
+    for name in ['animation', 'stateWindow']:
+        if name in results:
+            statistics = results[name]
+            print(name + ": " + str(round(statistics['fps'])) + " FPS, p50 " + str(round(statistics['p50'], 2)) + " ms, p95 "
+                  + str(round(statistics['p95'], 2)) + " ms, p99 " + str(round(statistics['p99'], 2)) + " ms, "
+                  + str(round(statistics['allocatedBytesPerFrame'])) + " B allocated per frame")
+
+    return writeResults(results, arguments.output or "results/benchmark.json")
+
+if __name__ == '__main__':
+    sys.exit(main())
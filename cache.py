@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from schmidt import ANALYSIS_VERSION, schmidtAnalysis
+
+def analysisKey(values, resolution=10, samples=None, name="schmidtAnalysis", version=ANALYSIS_VERSION):
+    """
+    Returns a content-hash of the input of an analysis.
+    Input: 'values' List of 11 values used for calculation
+    'resolution', 'samples' Crank-angle grid of the analysis
+    'name' String naming the analysis
+    'version' Version of the results of the analysis, so that results of an older version are not reused
+    Output: 'key' String containing a hexadecimal SHA-256 digest
+    """
+
+    digest = hashlib.sha256()
+    digest.update(name.encode())
+    digest.update(str(version).encode())
+    digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    digest.update(repr((float(resolution), samples)).encode())
+
+    return digest.hexdigest()
+
+class AnalysisCache():
+    """
+    Memoizes the results of an analysis, keyed by a hash of its input.
+    Results are kept in a size-bounded LRU-cache in memory and, when 'directory' is given, as '.npy'-files on disk,
+    so that restarted sessions on the same engine definition do not recompute the analysis.
+    Cached results are read-only Numpy arrays. The keys include 'version', the version of the results of the analysis,
+    so results on disk from before a change of the analysis are not served.
+    """
+
+    def __init__(self, maxSize=32, directory=None, analysis=schmidtAnalysis, version=ANALYSIS_VERSION):
+        self.maxSize = maxSize
+        self.directory = directory
+        self.analysis = analysis
+        self.version = version
+        self.memoryHits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, values, resolution=10, samples=None):
+        """
+        Returns the result of the analysis, computing it only if it is not cached.
+        Input: 'values' List of 11 values used for calculation
+        'resolution', 'samples' Crank-angle grid, see 'schmidt.crankAngles'
+        Output: 'cycleAnalysis' Read-only matrix of results
+        """
+
+        key = analysisKey(values, resolution, samples, self.analysis.__name__, self.version)
+
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.memoryHits += 1
+                return self._results[key]
+
+        result = self._readFromDisk(key)
+
+        if result is None:
+            result = self.analysis(values, resolution, samples)
+            self._writeToDisk(key, result)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.diskHits += 1
+
+        result.setflags(write=False)
+
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxSize:
+                self._results.popitem(last=False)
+
+        return result
+
+    def clear(self):
+        """
+        Removes every result from memory. Results on disk are kept.
+        """
+
+        with self._lock:
+            self._results.clear()
+
+    def statistics(self):
+        """
+        Returns the hit- and miss-counters of the cache.
+        Output: 'statistics' Dict containing the counters and the number of results in memory
+        """
+
+        with self._lock:
+            return {
+                'memoryHits': self.memoryHits,
+                'diskHits': self.diskHits,
+                'misses': self.misses,
+                'size': len(self._results),
+            }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npy")
+
+    def _readFromDisk(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+
+        try:
+            return np.load(self._path(key))
+        except (OSError, ValueError):
+            # A damaged file is recomputed and overwritten
+            return None
+
+    def _writeToDisk(self, key, result):
+        if self.directory is None:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporaryPath = self._path(key) + "." + str(os.getpid()) + ".tmp"
+            with open(temporaryPath, 'wb') as cacheFile:
+                np.save(cacheFile, result)
+            os.replace(temporaryPath, self._path(key))
+        except OSError:
+            print("Could not write the analysis to the cache in: " + self.directory)
+
+# Cache shared by the windows of the application
+analysisCache = AnalysisCache(directory="results/cache")
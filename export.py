@@ -0,0 +1,206 @@
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.image
+from filemanager import readFromJSON
+from schmidt import schmidtAnalysis
+
+class CyclePanels():
+    """
+    Plot panels shown next to the animation in an exported frame: volume, pressure, work and forces of a Schmidt-analysis,
+    with a marker at the crank angle of the frame. The figure is built once and only the marker moves between frames.
+    """
+
+    def __init__(self, cycleAnalysis, height):
+        """
+        Input: 'cycleAnalysis' Matrix of results from 'schmidtAnalysis'
+        'height' Height of the panels in pixels, equal to the height of the animation
+        """
+
+        dpi = 100
+        self.figure = Figure(figsize=(height * 1.1 / dpi, height / dpi), dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        degrees = cycleAnalysis[:,0]
+        axes = self.figure.subplots(2, 2)
+
+        axes[0, 0].fill_between(degrees, cycleAnalysis[:,2] + cycleAnalysis[:,3], color='lightskyblue', label="Expansion volume")
+        axes[0, 0].fill_between(degrees, cycleAnalysis[:,2], color='indianred', label="Compression volume")
+        axes[0, 0].set_ylim(0, 30000000)
+        axes[0, 0].set_title("Volume variation")
+        axes[0, 0].set_ylabel("Volume [mm3]")
+
+        for column, color, label in [(6, 'b', "P_1"), (7, 'r', "P_2"), (14, 'g', "P_3"), (15, 'y', "P_4")]:
+            axes[0, 1].plot(degrees, cycleAnalysis[:,column], color=color, label=label)
+        axes[0, 1].set_ylim(0, 20)
+        axes[0, 1].set_title("Circuit pressure")
+        axes[0, 1].set_ylabel("Pressure [N/mm2]")
+
+        for column, color, label in [(8, 'b', "W_1"), (9, 'r', "W_2"), (10, 'g', "W_R")]:
+            axes[1, 0].plot(degrees[1:], cycleAnalysis[1:,column] / 1000, color=color, label=label)
+        axes[1, 0].set_ylim(-20, 20)
+        axes[1, 0].set_title("Mechanical work")
+        axes[1, 0].set_ylabel("Work [kNm]")
+
+        for column, color, label in [(11, 'b', "F_O"), (12, 'r', "F_U"), (13, 'g', "F_R")]:
+            axes[1, 1].plot(degrees[1:], cycleAnalysis[1:,column] / 1000, color=color, label=label)
+        axes[1, 1].set_ylim(-500, 1500)
+        axes[1, 1].set_title("Piston forces")
+        axes[1, 1].set_ylabel("Force [kN]")
+
+        self.markers = []
+        for plotAxes in axes.flat:
+            plotAxes.set_xlim(0, 360)
+            plotAxes.set_xticks(np.arange(0, 420, 60))
+            plotAxes.set_xlabel("Degrees")
+            plotAxes.grid()
+            plotAxes.legend(fontsize='x-small', loc='upper right')
+            self.markers.append(plotAxes.axvline(0, color='k', linewidth=2))
+
+        self.figure.tight_layout()
+
+    def render(self, degree):
+        """
+        Input: 'degree' Crank angle of the marker
+        Output: 'image' Numpy array of shape (height, width, 3) with RGB-values 0-255
+        """
+
+        for marker in self.markers:
+            marker.set_xdata([degree % 360, degree % 360])
+
+        self.figure.canvas.draw()
+
+        return np.asarray(self.figure.canvas.buffer_rgba())[:, :, :3].copy()
+
+def captureFrames(degrees, resolution=0.1):
+    """
+    Renders the animation offscreen and yields the frame of each crank angle. Creates its own render window,
+    so it can run in a worker process.
+    Input: 'degrees' Crank angles of the frames
+    'resolution' Step of the kinematics table in degrees, see 'animation.KinematicsTable'
+    Output: 'image' Numpy array of shape (800, 450, 3) with RGB-values 0-255, for each degree
+    """
+
+    from vtkmodules.vtkRenderingCore import vtkWindowToImageFilter
+    from vtkmodules.util.numpy_support import vtk_to_numpy
+    from animation import StirlingAnimation
+
+    stirlingAnimation = StirlingAnimation(resolution=resolution, offScreen=True)
+    width, height = stirlingAnimation.renderWindow.GetSize()
+
+    windowToImage = vtkWindowToImageFilter()
+    windowToImage.SetInput(stirlingAnimation.renderWindow)
+    windowToImage.ReadFrontBufferOff()
+
+    for degree in degrees:
+        stirlingAnimation.animateStep(degree)
+        windowToImage.Modified()
+        windowToImage.Update()
+
+        # VTK stores the rows from the bottom up
+        yield vtk_to_numpy(windowToImage.GetOutput().GetPointData().GetScalars()).reshape(height, width, -1)[::-1, :, :3]
+
+def renderFrames(values, degrees, firstFrame, outputDirectory, scale=1, withPlots=True):
+    """
+    Renders a range of frames offscreen to PNG-files. Runs in a worker process with its own render window.
+    Input: 'values' List of 11 values used for the Schmidt-analysis of the plot panels
+    'degrees' Crank angles of the frames
+    'firstFrame' Number of the first frame, used in the file names 'frame_00000.png'
+    'outputDirectory' String containing the directory of the frames
+    'scale' Integer magnification of the animation. The 2D-actors are drawn in pixels, so the animation is magnified
+    by repeating pixels, while the plot panels are rendered at the magnified size.
+    'withPlots' Boolean, adds the plot panels to the right of the animation when True
+    Output: 'frames' Number of frames written
+    """
+
+    panels = None
+
+    for frame, (degree, image) in enumerate(zip(degrees, captureFrames(degrees)), start=firstFrame):
+        image = np.repeat(np.repeat(image, scale, axis=0), scale, axis=1)
+
+        # The panels show the table of the app and the PDF, with 10 degrees between rows, since the work columns
+        # depend on the step. The marker is drawn between the rows.
+        if withPlots and panels is None:
+            panels = CyclePanels(schmidtAnalysis(values), image.shape[0])
+
+        if panels is not None:
+            image = np.hstack([image, panels.render(degree)])
+
+        matplotlib.image.imsave(os.path.join(outputDirectory, "frame_" + str(frame).zfill(5) + ".png"), np.ascontiguousarray(image))
+
+    return len(degrees)
+
+def exportCycle(values, outputDirectory, step=1.0, scale=1, withPlots=True, workers=None):
+    """
+    Exports one cycle of the animation as PNG-frames, rendered in parallel. Each worker process renders a contiguous range of degrees.
+    Input: 'values' List of 11 values used for calculation
+    'outputDirectory' String containing the directory of the frames. Frames already in it are removed.
+    'step' Crank-angle step between frames in degrees
+    'scale' Integer magnification, see 'renderFrames'
+    'withPlots' Boolean, adds the plot panels when True
+    'workers' Number of worker processes. Defaults to the number of cores.
+    Output: 'frames' Number of frames written
+    """
+
+    # Frames of an earlier export are removed, since 'encodeVideo' would append them to the video
+    os.makedirs(outputDirectory, exist_ok=True)
+    for fileName in glob.glob(os.path.join(outputDirectory, "frame_*.png")):
+        os.remove(fileName)
+
+    degrees = np.arange(0, 360, step)
+    workers = min(workers or os.cpu_count() or 1, len(degrees))
+    ranges = np.array_split(np.arange(len(degrees)), workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(renderFrames, values, degrees[indices], int(indices[0]), outputDirectory, scale, withPlots)
+                   for indices in ranges if len(indices)]
+
+        return sum(future.result() for future in futures)
+
+def encodeVideo(frameDirectory, videoPath, fps=30):
+    """
+    Encodes the PNG-frames of a directory as a video with 'ffmpeg', which must be installed.
+    Input: 'frameDirectory' String containing the directory of the frames
+    'videoPath' String containing the path of the video, e.g. 'cycle.mp4'
+    'fps' Frames per second of the video
+    """
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise Exception("Could not encode the video. Ensure 'ffmpeg' is installed, or use the PNG-frames in: " + frameDirectory)
+
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-i", os.path.join(frameDirectory, "frame_%05d.png"),
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", videoPath], check=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exports one cycle of the animation with plot panels as PNG-frames or a video, rendered offscreen.")
+    parser.add_argument("input", nargs="?", default="assets/default.json", help="JSON-file with the engine definition (default: assets/default.json)")
+    parser.add_argument("-o", "--output", default="results/frames", help="directory for the frames (default: results/frames)")
+    parser.add_argument("-s", "--step", type=float, default=1.0, help="crank-angle step between frames in degrees (default: 1)")
+    parser.add_argument("--scale", type=int, default=1, help="integer magnification of the frames (default: 1)")
+    parser.add_argument("--no-plots", action="store_true", help="export the animation without the plot panels")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--video", default=None, help="also encode the frames as this video-file with ffmpeg")
+    parser.add_argument("--fps", type=int, default=30, help="frames per second of the video (default: 30)")
+    arguments = parser.parse_args(argv)
+
+    values = readFromJSON(arguments.input)
+
+    startTime = time.perf_counter()
+    frames = exportCycle(values, arguments.output, arguments.step, arguments.scale, not arguments.no_plots, arguments.workers)
+    print("Rendered " + str(frames) + " frames in " + str(round(time.perf_counter() - startTime, 2)) + " s.")
+    print("The frames are saved in: " + arguments.output)
+
+    if arguments.video is not None:
+        encodeVideo(arguments.output, arguments.video, arguments.fps)
+        print("The video is saved in: " + arguments.video)
+
+if __name__ == '__main__':
+    sys.exit(main())
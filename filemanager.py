@@ -1,6 +1,29 @@
 import csv
 import json
+import os
+import threading
 import numpy as np
+from schmidt import RESULT_COLUMNS
+
+def checkValues(values):
+    """
+    Checks that every value is given and is a finite, non-negative number.
+    Input: 'values' List of values, either numbers or strings from GUI-input
+    Output: 'isApproved' Boolean
+    """
+
+    for value in values:
+        if (value is not None and value != ''):
+            try:    
+                fValue = float(value)
+                if (fValue < 0 or not np.isfinite(fValue)):
+                    return False
+            except:
+                return False
+        else:
+            return False
+
+    return True
 
 def readFromJSON(fileName):
     """
@@ -44,37 +67,26 @@ def writeToJSON(fileName, values):
     Input: 'fileName' String Filename (does not include '.json')
     'values' List containing string values from GUI-input
     """
-    try:
-        # Convert to dict?
-        gasConstant = str(values[0])
-        mass = str(values[1])
-        tHot = str(values[2])
-        tReg = str(values[3])
-        tCold = str(values[4])
-        sweptVol = str(values[5])
-        regVol = str(values[6])
-        avgVol = str(values[7])
-        rodArea = str(values[8])
-        cylArea = str(values[9])
-        phaseAngle = str(values[10])
-    except:
-        print("Missing required values.")
-    
-    jsonString = ("{\"volume\":[{\"swept\":" + sweptVol + 
-                  "},{\"regenerator\":" + regVol +
-                  "},{\"average\":" + avgVol +
-                  "}],\"area\":[{\"piston\":" + rodArea +
-                  "},{\"cylinder\":" + cylArea + 
-                  "}],\"temperature\":[{\"hot\":" + tHot +
-                  "},{\"regenerator\":" + tReg +
-                  "},{\"cold\":" + tCold +
-                  "}],\"additional\":[{\"gasconstant\":" + gasConstant +
-                  "},{\"mass\":" + mass +
-                  "},{\"phaseangle\":" + phaseAngle + "}]}")
+    if (len(values) != 11 or not checkValues(values)):
+        print("Missing or invalid values. Every value must be a finite, non-negative number.")
+        return
+
+    gasConstant, mass, tHot, tReg, tCold, sweptVol, regVol, avgVol, rodArea, cylArea, phaseAngle = (float(value) for value in values)
+
+    jsonData = {
+        "volume": [{"swept": sweptVol}, {"regenerator": regVol}, {"average": avgVol}],
+        "area": [{"piston": rodArea}, {"cylinder": cylArea}],
+        "temperature": [{"hot": tHot}, {"regenerator": tReg}, {"cold": tCold}],
+        "additional": [{"gasconstant": gasConstant}, {"mass": mass}, {"phaseangle": phaseAngle}],
+    }
+
+    # Written to a temporary file first, so that a reader never sees a partly written file
+    filePath = "assets/" + fileName + ".json"
+    temporaryPath = filePath + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
     try:    
-        with open("assets/" + fileName + ".json", 'w') as jsonFile:
-            print(fileName)
-            jsonFile.write(jsonString)
+        with open(temporaryPath, 'w') as jsonFile:
+            json.dump(jsonData, jsonFile, indent=4)
+        os.replace(temporaryPath, filePath)
     except:
         print("Could not write to file. Ensure proper filename is given.")
 
@@ -125,16 +137,99 @@ def writeToCSV(fileName, values):
     except:
         raise Exception("Could not write to file. Ensure the file-name and list of values are correct.")
 
-def writeResultsToCSV(fileName, resultMatrix):
+def writeResultsToCSV(fileName, resultMatrix, resultDirectory="results", columns=RESULT_COLUMNS):
     """
     Writes a matrix to a csv-file with the given filename.
     Input: 'fileName' String containing desired filename for CSV-file containing results from a Schmidt-analysis. Must not include path or '.csv'.
     'resultMatrix' Numpy array containing results from a Schmidt-analysis
+    'resultDirectory' String containing the directory of the CSV-file
+    'columns' List of column names written as the header row
     """
     
-    filePath = "results/" + fileName + ".csv"
+    filePath = os.path.join(resultDirectory, fileName + ".csv")
     try:
-        np.savetxt(filePath, resultMatrix, delimiter=";")
+        with ResultWriter(filePath, columns) as writer:
+            writer.write(resultMatrix)
         print("The results are saved in: " + filePath)
-    except:
-        raise Exception("Could not write to file. Ensure the file-name and matrix are correct.")
\ No newline at end of file
+    except OSError:
+        raise Exception("Could not write to file. Ensure the file-name and matrix are correct.")
+
+class ResultWriter():
+    """
+    Streams results to a file chunk by chunk, so that memory is bounded by the chunk size and not by the number of rows.
+    The format is chosen from the extension of 'filePath':
+    '.csv' writes a header row followed by one row per result, separated by 'delimiter'.
+    '.npy' writes a one-dimensional structured Numpy array with one named field per column, readable with
+    'np.load(filePath, mmap_mode="r")'. The row count in the header is updated when the writer is closed.
+    """
+
+    # The data in a '.npy'-file starts at a multiple of 64 bytes
+    _NPY_HEADER_ALIGNMENT = 64
+
+    def __init__(self, filePath, columns, delimiter=";", fmt="%.18e"):
+        self.filePath = filePath
+        self.columns = list(columns)
+        self.delimiter = delimiter
+        self.fmt = fmt
+        self.rows = 0
+        self.binary = os.path.splitext(filePath)[1].lower() == ".npy"
+
+        if self.binary:
+            self.dtype = np.dtype([(column, np.float64) for column in self.columns])
+            self._file = open(filePath, 'wb')
+            # Reserves a header long enough for any row count, so that it can be rewritten in place when closing
+            self._headerLength = len(self._npyHeader(np.iinfo(np.int64).max))
+            self._file.write(self._npyHeader(0, self._headerLength))
+        else:
+            self._file = open(filePath, 'w', newline='')
+            self._file.write(delimiter.join(self.columns) + "\n")
+
+    def write(self, chunk):
+        """
+        Appends a chunk of results.
+        Input: 'chunk' Numpy array with one column per name in 'columns'. Arrays with more than two dimensions,
+        e.g. (N, angles, columns) from a batch analysis, are written as (N * angles) rows.
+        """
+
+        chunk = np.asarray(chunk, dtype=np.float64)
+        chunk = chunk.reshape(-1, chunk.shape[-1]) if chunk.ndim > 1 else chunk.reshape(1, -1)
+
+        if chunk.shape[1] != len(self.columns):
+            raise ValueError("Expected " + str(len(self.columns)) + " columns, got " + str(chunk.shape[1]) + ".")
+
+        if self.binary:
+            self._file.write(np.ascontiguousarray(chunk).tobytes())
+        else:
+            np.savetxt(self._file, chunk, delimiter=self.delimiter, fmt=self.fmt)
+
+        self.rows += chunk.shape[0]
+
+    def close(self):
+        """
+        Completes and closes the file.
+        """
+
+        if self._file.closed:
+            return
+
+        if self.binary:
+            self._file.seek(0)
+            self._file.write(self._npyHeader(self.rows, self._headerLength))
+
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        self.close()
+
+    def _npyHeader(self, rows, length=None):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False, 'shape': (rows,)})
+        # Magic string, version 1.0 and the length of the header, followed by the header padded with spaces
+        prefixLength = len(np.lib.format.MAGIC_PREFIX) + 4
+        if length is None:
+            length = -(-(prefixLength + len(header) + 1) // self._NPY_HEADER_ALIGNMENT) * self._NPY_HEADER_ALIGNMENT
+        header = header.ljust(length - prefixLength - 1) + "\n"
+
+        return np.lib.format.MAGIC_PREFIX + bytes([1, 0]) + len(header).to_bytes(2, 'little') + header.encode('latin1')
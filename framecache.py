@@ -0,0 +1,226 @@
+import hashlib
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+def renderCompressedFrames(degrees):
+    """
+    Renders frames of the animation offscreen and compresses them. Runs in a worker process.
+    Input: 'degrees' Crank angles of the frames
+    Output: 'shape' Tuple (height, width, 3) of the frames
+    'frames' List of zlib-compressed RGB-frames as bytes
+    """
+
+    from export import captureFrames
+
+    shape = None
+    frames = []
+
+    for image in captureFrames(degrees):
+        shape = image.shape
+        frames.append(zlib.compress(np.ascontiguousarray(image).tobytes(), 1))
+
+    return shape, frames
+
+class FrameCache():
+    """
+    Pre-rendered frames of one cycle of the animation, so that playback and scrubbing only show an image instead of
+    updating and rendering the VTK-pipeline. The frames are rendered once by offscreen worker processes and kept
+    zlib-compressed, which is about 20 kB per frame. A cycle that does not fit in 'maxBytes' is not kept at all and the
+    animation is rendered live instead. The cache remembers this, so the cycle is not rendered again on the next 'render'.
+    The animation does not depend on the input values, so one cycle serves every session. When 'directory' is given,
+    a completed cycle is saved as a '.npz'-file keyed by the number of frames, the render size and 'RENDER_VERSION'.
+    """
+
+    # Size of the offscreen render window of 'export.captureFrames' [pixels]
+    RENDER_SIZE = (450, 800)
+
+    # Increase when the geometry or the look of the animation changes, so that saved frames are rendered again
+    RENDER_VERSION = 1
+
+    def __init__(self, framesPerCycle=360, maxBytes=64 * 1024 * 1024, directory=None):
+        self.framesPerCycle = framesPerCycle
+        self.maxBytes = maxBytes
+        self.directory = directory
+        self.shape = None
+        self.nbytes = 0
+        self.overBudget = False
+        self._frames = [None] * framesPerCycle
+        self._key = None
+        self._executor = None
+        self._futures = {}
+
+    def key(self):
+        """
+        Output: 'key' String containing the hash of the frames
+        """
+
+        digest = hashlib.sha256()
+        digest.update(repr(("StirlingAnimation", self.framesPerCycle, self.RENDER_SIZE, self.RENDER_VERSION)).encode())
+
+        return digest.hexdigest()
+
+    def index(self, degree):
+        """
+        Returns the frame showing a crank angle.
+        Input: 'degree' Crank angle in degrees
+        Output: 'index' Index of the nearest frame
+        """
+
+        return int(round(degree * self.framesPerCycle / 360)) % self.framesPerCycle
+
+    def render(self, workers=2):
+        """
+        Starts rendering the missing frames in the background, unless they are cached already, found on disk or do not
+        fit in 'maxBytes'. Frames collected before a 'cancel' are kept. Finished frames are collected by 'poll'.
+        Input: 'workers' Number of worker processes
+        Output: 'finished' Boolean, True when nothing is rendered, see 'finished'
+        """
+
+        if self.finished():
+            return True
+
+        self.cancel()
+
+        if self._key != self.key():
+            self._frames = [None] * self.framesPerCycle
+            self.nbytes = 0
+            self._key = self.key()
+
+            if self._readFromDisk():
+                return True
+
+        # Forked workers would share the display connection of the application, so they are spawned
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        degrees = np.arange(self.framesPerCycle) * 360 / self.framesPerCycle
+        missing = np.array([index for index, frame in enumerate(self._frames) if frame is None])
+        for indices in np.array_split(missing, workers):
+            if len(indices):
+                self._futures[self._executor.submit(renderCompressedFrames, degrees[indices])] = indices
+
+        return False
+
+    def poll(self):
+        """
+        Stores the frames of the finished workers and saves a completed cycle to disk. When the frames exceed 'maxBytes',
+        rendering stops and the frames are released.
+        Output: 'complete' Boolean, True when no worker is running
+        """
+
+        for future in [future for future in self._futures if future.done()]:
+            indices = self._futures.pop(future)
+            try:
+                shape, frames = future.result()
+            except Exception as exception:
+                print("Could not pre-render the frames: " + str(exception))
+                continue
+
+            self.shape = shape
+            for index, frame in zip(indices, frames):
+                if self.nbytes + len(frame) > self.maxBytes:
+                    self.overBudget = True
+                    break
+                self._frames[index] = frame
+                self.nbytes += len(frame)
+
+        if self.overBudget:
+            self.cancel()
+            self._frames = [None] * self.framesPerCycle
+            self.nbytes = 0
+            return True
+
+        if self._futures:
+            return False
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            if self.complete():
+                self._writeToDisk()
+
+        return True
+
+    def complete(self):
+        """
+        Output: 'complete' Boolean, True when every frame of the cycle is cached
+        """
+
+        return all(frame is not None for frame in self._frames)
+
+    def finished(self):
+        """
+        Output: 'finished' Boolean, True when the cycle is cached or does not fit in 'maxBytes'
+        """
+
+        return self.overBudget or self.complete()
+
+    def frame(self, degree):
+        """
+        Input: 'degree' Crank angle in degrees
+        Output: 'image' Numpy array of shape (height, width, 3) with RGB-values 0-255, or None if the frame is not cached
+        """
+
+        frame = self._frames[self.index(degree)]
+        if frame is None:
+            return None
+
+        return np.frombuffer(zlib.decompress(frame), dtype=np.uint8).reshape(self.shape)
+
+    def cancel(self):
+        """
+        Stops rendering. Frames that are already collected are kept.
+        """
+
+        if self._executor is not None:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._futures = {}
+
+    def _path(self):
+        return os.path.join(self.directory, self._key + ".npz")
+
+    def _readFromDisk(self):
+        if self.directory is None or not os.path.exists(self._path()):
+            return False
+
+        try:
+            with np.load(self._path()) as cacheFile:
+                shape = tuple(cacheFile['shape'])
+                offsets = cacheFile['offsets']
+                data = cacheFile['data'].tobytes()
+        except (OSError, ValueError, KeyError):
+            # A damaged file is rendered again and overwritten
+            return False
+
+        if len(offsets) != self.framesPerCycle + 1:
+            return False
+
+        if offsets[-1] > self.maxBytes:
+            self.overBudget = True
+            return True
+
+        self.shape = shape
+        self._frames = [data[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        self.nbytes = int(offsets[-1])
+
+        return True
+
+    def _writeToDisk(self):
+        if self.directory is None:
+            return
+
+        offsets = np.concatenate([[0], np.cumsum([len(frame) for frame in self._frames])])
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporaryPath = self._path() + "." + str(os.getpid()) + ".tmp"
+            with open(temporaryPath, 'wb') as cacheFile:
+                np.savez(cacheFile, shape=np.array(self.shape), offsets=offsets,
+                         data=np.frombuffer(b"".join(self._frames), dtype=np.uint8))
+            os.replace(temporaryPath, self._path())
+        except OSError:
+            print("Could not write the frames to the cache in: " + self.directory)
@@ -1,35 +1,21 @@
-import random
+import dataclasses
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5 import QtCore
-from matplotlib import animation
-from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
-from PyQt5.QtWidgets import QGridLayout, QLabel, QLineEdit, QPushButton, QApplication, QDialog, QWidget, QProgressBar, QSpinBox, QSlider
+from PyQt5.QtWidgets import QGridLayout, QLabel, QLineEdit, QPushButton, QApplication, QDialog, QWidget, QProgressBar, QSpinBox, QDoubleSpinBox, QSlider
 import sys
-from PyQt5.QtCore import pyqtSignal, pyqtProperty, QPropertyAnimation, Qt
-from PyQt5 import QtGui, QtOpenGL
-from filemanager import readFromJSON, writeToJSON, writeResultsToCSV
+from PyQt5.QtCore import pyqtSignal, pyqtProperty, Qt
+from PyQt5 import QtGui
+from filemanager import readFromJSON, writeResultsToCSV
 from schmidt import *
-from animation import StirlingAnimation
-import matplotlib.pyplot as plt
-import pyqtgraph as pg
-#plt.use('Qt5Agg')
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-#from matplotlib.figure import Figure
+from profiler import FrameProfiler
+from session import EngineParameters, Session
+from simple import simpleAnalysis
 import numpy as np
-import sys
-
-def checkValues(values):
-    for value in values:
-        if (value is not None and value != ''):
-            try:    
-                fValue = float(value)
-                if (fValue < 0):
-                    return False
-            except:
-                return False
-        else:
-            return False
 
-    return True
+# VTK, OpenGL and pyqtgraph are imported by the windows using them, so that 'Intro' is shown without loading them
 
 class Intro(QDialog):
     def __init__(self, parent=None):
@@ -85,33 +71,25 @@ class Intro(QDialog):
     # Method for navigation
 
     def manualInput(self):
-        self.manualInput = ManualInput(self)
-        self.manualInput.show()
-        
-        if self.isVisible():
-            self.hide()
+        windowPool.navigate(self, ManualInput)
             
     def useDefaultValues(self):
         values = readFromJSON("assets/default.json")
         
-        isApproved = checkValues(values)
+        parameters = EngineParameters.fromValues(values)
 
-        if (isApproved):
-            writeToJSON("inputValues", values)
-            self.stateVisualization = StateWindow(self)
-            self.stateVisualization.show()
-            self.hide()
+        if (parameters is not None):
+            session = Session(parameters)
+            self.stateVisualization = windowPool.navigate(self, StateWindow, session)
             
     def useCustomValues(self):
         values = readFromJSON("assets/custom.json")
         
-        isApproved = checkValues(values)
+        parameters = EngineParameters.fromValues(values)
 
-        if (isApproved):
-            writeToJSON("inputValues", values)
-            self.stateVisualization = StateWindow(self)
-            self.stateVisualization.show()
-            self.hide()
+        if (parameters is not None):
+            session = Session(parameters)
+            self.stateVisualization = windowPool.navigate(self, StateWindow, session)
 
 class ManualInput(QDialog):
     def __init__(self, parent=None):
@@ -239,9 +217,7 @@ class ManualInput(QDialog):
         self.continueButton.clicked.connect(self.continueToCalculation)
         
     def returnToIntro(self):
-        self.intro = Intro(self)
-        self.intro.show()
-        self.hide()
+        self.intro = windowPool.navigate(self, Intro)
     
     def continueToCalculation(self):
         valueList = [self.gas_constant, self.m, self.th, self.tr, self.tc, self.v_cyl, self.v_reg, self.v_c_avg, self.piston_rod_area, self.piston_cyl_area, self.beta]
@@ -250,33 +226,230 @@ class ManualInput(QDialog):
         for item in valueList:
             values.append(item.text())
 
-        isApproved = checkValues(values)
+        parameters = EngineParameters.fromValues(values)
 
-        if (isApproved):
-            writeToJSON("inputValues", values)
-            self.stateVisualization = StateWindow(self)
-            self.stateVisualization.show()
-            self.hide()
+        if (parameters is not None):
+            session = Session(parameters)
+            self.stateVisualization = windowPool.navigate(self, StateWindow, session)
         else:
-            self.manualInput = ManualInput(self)
-            self.manualInput.show()
-            self.hide()
+            self.prompt.setText("Please enter the values below. Every value must be a non-negative number.")
 
-class StateWindow(QDialog):
+class TuningPanel(QWidget):
+    """Sliders and spin boxes for changing the input-values while the state is shown.
+    'parametersChanged' is emitted once the values have not changed for 'debounce' milliseconds,
+    so that dragging a slider does not request an analysis for every step.
+    """
     
-    valueChanged = pyqtSignal(int)
+    parametersChanged = pyqtSignal(object)
+    
+    # Name in 'EngineParameters', label, smallest maximum of the range and decimals
+    FIELDS = [
+        ("Th", "Hot side [C]", 1000, 1),
+        ("Tr", "Regenerator [C]", 1000, 1),
+        ("Tc", "Cold side [C]", 500, 1),
+        ("beta", "Phase-angle β", 180, 1),
+        ("V_cyl", "Cylinder [mm^3]", 50000000, 0),
+        ("V_reg", "Regenerator [mm^3]", 50000000, 0),
+        ("V_c_avg", "Cylinder average [mm^3]", 50000000, 0),
+        ("m", "Mass", 5, 3),
+    ]
+    
+    SLIDER_STEPS = 1000
+    
+    def __init__(self, parameters, parent=None, debounce=20):
+        super(TuningPanel, self).__init__(parent)
+        self.parameters = parameters
+        self.lastChange = 0.0
+        self.spinBoxes = {}
+        self.sliders = {}
+        
+        self.debounceTimer = QtCore.QTimer(self)
+        self.debounceTimer.setSingleShot(True)
+        self.debounceTimer.setInterval(debounce)
+        self.debounceTimer.timeout.connect(self.emitParameters)
+        
+        layout = QGridLayout(self)
+        
+        for row, (name, label, maximum, decimals) in enumerate(self.FIELDS):
+            value = getattr(parameters, name)
+            
+            spinBox = QDoubleSpinBox(self)
+            spinBox.setDecimals(decimals)
+            spinBox.setRange(0, max(maximum, 2 * value))
+            spinBox.setSingleStep(10 ** -decimals if decimals else max(1, round(spinBox.maximum() / self.SLIDER_STEPS)))
+            spinBox.setValue(value)
+            spinBox.setFixedSize(120, 30)
+            
+            slider = QSlider(Qt.Horizontal, self)
+            slider.setRange(0, self.SLIDER_STEPS)
+            slider.setValue(self.sliderPosition(spinBox, value))
+            slider.setFixedSize(150, 30)
+            slider.setFocusPolicy(QtCore.Qt.NoFocus)
+            
+            spinBox.valueChanged.connect(lambda value, name=name: self.spinBoxChanged(name, value))
+            slider.valueChanged.connect(lambda position, name=name: self.sliderMoved(name, position))
+            
+            prompt = QLabel(label)
+            prompt.setFixedSize(160, 30)
+            layout.addWidget(prompt, row, 0, 1, 1)
+            layout.addWidget(slider, row, 1, 1, 1)
+            layout.addWidget(spinBox, row, 2, 1, 1)
+            
+            self.spinBoxes[name] = spinBox
+            self.sliders[name] = slider
+        
+        self.latencyLabel = QLabel(self)
+        self.latencyLabel.setFixedSize(300, 30)
+        layout.addWidget(self.latencyLabel, len(self.FIELDS), 0, 1, 3)
+        
+        self.performanceLabel = QLabel(self)
+        self.performanceLabel.setFixedSize(430, 60)
+        layout.addWidget(self.performanceLabel, len(self.FIELDS) + 1, 0, 1, 3)
+    
+    def sliderPosition(self, spinBox, value):
+        return int(round(self.SLIDER_STEPS * (value - spinBox.minimum()) / (spinBox.maximum() - spinBox.minimum())))
+    
+    def sliderMoved(self, name, position):
+        spinBox = self.spinBoxes[name]
+        spinBox.setValue(spinBox.minimum() + (spinBox.maximum() - spinBox.minimum()) * position / self.SLIDER_STEPS)
+    
+    def spinBoxChanged(self, name, value):
+        # Moving the slider must not set the spin box again through 'sliderMoved'
+        slider = self.sliders[name]
+        slider.blockSignals(True)
+        slider.setValue(self.sliderPosition(self.spinBoxes[name], value))
+        slider.blockSignals(False)
+        
+        self.lastChange = time.perf_counter()
+        self.debounceTimer.start()
+    
+    def setParameters(self, parameters):
+        """Shows other input-values without emitting 'parametersChanged'."""
+        
+        self.debounceTimer.stop()
+        self.parameters = parameters
+        
+        for name, spinBox in self.spinBoxes.items():
+            value = getattr(parameters, name)
+            spinBox.blockSignals(True)
+            spinBox.setMaximum(max(spinBox.maximum(), 2 * value))
+            spinBox.setValue(value)
+            spinBox.blockSignals(False)
+            self.sliders[name].blockSignals(True)
+            self.sliders[name].setValue(self.sliderPosition(spinBox, value))
+            self.sliders[name].blockSignals(False)
+    
+    def emitParameters(self):
+        self.parameters = dataclasses.replace(self.parameters, **{name: spinBox.value() for name, spinBox in self.spinBoxes.items()})
+        self.parametersChanged.emit(self.parameters)
+    
+    def showPerformance(self, performance):
+        """Shows the loss-corrected performance of the values.
+
+        Args:
+            performance (dict): The results of 'simple.simpleAnalysis'.
+        """
+        
+        self.performanceLabel.setText("Shaft power with losses: " + str(round(performance['power'] / 1000, 1)) + " kW\n"
+                                      + "Efficiency with losses: " + str(round(performance['efficiency'] * 100, 1)) + " %")
+    
+    def showLatency(self):
+        self.latencyLabel.setText("Updated " + str(round((time.perf_counter() - self.lastChange) * 1000)) + " ms after the last change")
+
+class LiveAnalysis(QtCore.QObject):
+    """Calculates the Schmidt-analysis of changed input-values on a worker thread.
+    Each request gets a generation number. A request that is outdated by a newer one is skipped if it has not started,
+    and its result is dropped if it has, so that only the latest values are shown.
+    """
+    
+    resultReady = pyqtSignal(int, object)
     
     def __init__(self, parent=None):
+        super(LiveAnalysis, self).__init__(parent)
+        self.generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+    
+    def request(self, parameters):
+        self.generation += 1
+        generation = self.generation
+        
+        future = self._executor.submit(self.analyse, generation, parameters)
+        future.add_done_callback(lambda future: self.analysisDone(generation, future))
+    
+    def analyse(self, generation, parameters):
+        if generation != self.generation:
+            return None
+        
+        # Not cached, since every step of a slider would be written to the cache on disk
+        return Session(parameters, schmidtAnalysis(parameters.values()))
+    
+    def analysisDone(self, generation, future):
+        # Called in the worker thread. The signal is delivered in the thread of the window.
+        if generation != self.generation or future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        
+        self.resultReady.emit(generation, future.result())
+    
+    def discard(self):
+        # Results of the requests made so far are dropped
+        self.generation += 1
+    
+    def shutdown(self):
+        self.discard()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class StateWindow(QDialog):
+    
+    valueChanged = pyqtSignal(float)
+    
+    def __init__(self, parent=None, session=None, cycleAnalysis=None, profile=None, cachedPlayback=None):
         super(StateWindow, self).__init__(parent)
+        from PyQt5 import QtOpenGL
+        from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+        from vtkmodules.vtkRenderingCore import vtkTextActor
+        from animation import StirlingAnimation, FrameScheduler
+        from framecache import FrameCache
+        
+        # Without a session, e.g. when the window is opened on its own, the saved input-values are used
+        if session is None:
+            session = Session.fromFile(cycleAnalysis=cycleAnalysis)
+        self.session = session
         window = QtOpenGL.QGLWidget()
         self.setWindowTitle("Stirling engine state visualization")
         
         self.widget = QVTKRenderWindowInteractor(window)
         self.widget.setFixedSize(450, 800)
         self.widget.Initialize()
+        self.frameView = QLabel(self)
+        self.frameView.setFixedSize(450, 800)
+        self.frameView.hide()
         self._degree = 0
         
-        self.stirlingAnimation = StirlingAnimation()
+        # State changes are collected and applied once per event-loop turn by 'flushUpdate'
+        self._pendingDegree = 0
+        self._dirty = set()
+        self._flushScheduled = False
+        self.frameCount = 0
+        self.renderCount = 0
+        self.widget.GetRenderWindow().AddObserver("EndEvent", self.countRender)
+        
+        # Timing of each frame, enabled with 'profile' or the environment variable 'STIRLING_PROFILE'.
+        # A value ending in '.json' or '.csv' is used as the path of the exported trace.
+        profileSetting = os.environ.get("STIRLING_PROFILE", "") if profile is None else profile
+        self.profileTracePath = profileSetting if str(profileSetting).lower().endswith((".json", ".csv")) else "results/frameprofile.json"
+        self.profiler = FrameProfiler(enabled=bool(profileSetting) and profileSetting != "0")
+        
+        # Playback of pre-rendered frames, enabled with 'cachedPlayback' or the environment variable 'STIRLING_CACHED_PLAYBACK'.
+        # A value of '720' caches frames every half degree, other values every degree.
+        cacheSetting = os.environ.get("STIRLING_CACHED_PLAYBACK", "") if cachedPlayback is None else cachedPlayback
+        self.frameCache = None
+        self.cachedPlayback = False
+        if cacheSetting and cacheSetting != "0":
+            self.frameCache = FrameCache(framesPerCycle=720 if str(cacheSetting) == "720" else 360, directory="results/cache")
+        
+        # Fractional degrees from the frame scheduler are shown with a tenth of a degree resolution
+        # The renderer is shown in 'self.widget', so the animation does not create a render window of its own
+        self.stirlingAnimation = StirlingAnimation(resolution=0.1, window=False)
         self.ren = self.stirlingAnimation.getRenderer()
         self.widget.GetRenderWindow().AddRenderer(self.ren)
         
@@ -311,15 +484,18 @@ class StateWindow(QDialog):
         self.ren.AddActor(self.compressionPistonRodActor)
         self.ren.AddActor(self.compressionPistonAnchorActor)
         
-        self.ren.Render()
+        self.profileOverlay = vtkTextActor()
+        self.profileOverlay.GetTextProperty().SetFontFamilyToCourier()
+        self.profileOverlay.GetTextProperty().SetFontSize(11)
+        self.profileOverlay.GetTextProperty().SetColor(0.0, 0.0, 0.0)
+        self.profileOverlay.SetDisplayPosition(5, 5)
+        self.profileOverlay.SetVisibility(self.profiler.enabled)
+        self.ren.AddActor(self.profileOverlay)
         
-        self.animation = QPropertyAnimation(self, b"degree")
-        self.animation.setLoopCount(100)
-        self.animation.setEndValue(360)
-        self.animation.setDuration(10000)
-        self.animation.start()
+        self.ren.Render()
         
-        # StartValue = self.degree, EndValue = self.degree + 360
+        self.animation = FrameScheduler(targetFps=30, cycleDuration=10000, parent=self)
+        self.animation.frame.connect(self.setDegree)
         
         # Create widgets
         self.returnButton = QPushButton("Return")
@@ -328,6 +504,9 @@ class StateWindow(QDialog):
         self.continueButton = QPushButton("Continue")
         self.continueButton.setFixedSize(100, 50)
         self.continueButton.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.saveButton = QPushButton("Save values")
+        self.saveButton.setFixedSize(100, 50)
+        self.saveButton.setFocusPolicy(QtCore.Qt.NoFocus)
         
         self.spinBox = QSpinBox(self)
         #self.spinBox.setFocusPolicy(QtCore.Qt.NoFocus)
@@ -343,6 +522,9 @@ class StateWindow(QDialog):
         self.slider.setRange(5000, 15000)
         self.slider.setFixedSize(360, 30)
         self.slider.setValue(10000)
+        self.slider.valueChanged.connect(self.animation.setCycleDuration)
+        self.fpsLabel = QLabel(self)
+        self.fpsLabel.setFixedSize(90, 50)
         
         # Create navigation-buttons
         self.playButton = QPushButton("Play")
@@ -355,17 +537,28 @@ class StateWindow(QDialog):
         # Create plots
         self.createPlots()
         
+        # Changed input-values are analysed on a worker thread and shown without rebuilding the window
+        self.tuningPanel = TuningPanel(self.session.parameters, self)
+        self.liveAnalysis = LiveAnalysis(self)
+        self.tuningPanel.parametersChanged.connect(self.liveAnalysis.request)
+        self.liveAnalysis.resultReady.connect(self.showAnalysis)
+        self.showPerformance()
+        
         # Create layout and add widgets
         layout = QGridLayout(window)
         layout.addWidget(self.widget, 0, 0, 10, 5)
+        layout.addWidget(self.frameView, 0, 0, 10, 5)
         layout.addWidget(self.playButton, 13, 1, 1, 1)
         layout.addWidget(self.pauseButton, 13, 3, 1, 1)
         layout.addWidget(self.returnButton, 13, 8, 1, 1)
         layout.addWidget(self.continueButton, 13, 10, 1, 1)
+        layout.addWidget(self.saveButton, 13, 12, 1, 1)
         layout.addWidget(self.spinBox, 12, 0, 1, 1)
+        layout.addWidget(self.fpsLabel, 13, 0, 1, 1)
         layout.addWidget(self.progressBar, 11, 0, 1, 5)
         layout.addWidget(self.slider, 12, 1, 1, 3)
         layout.addWidget(self.canvas, 0, 5, 13, 10)
+        layout.addWidget(self.tuningPanel, 0, 15, 13, 3)
         
         # Set layout
         self.setLayout(layout)
@@ -375,26 +568,62 @@ class StateWindow(QDialog):
         self.pauseButton.clicked.connect(self.pauseAnimation)
         self.returnButton.clicked.connect(self.returnToIntro)
         self.continueButton.clicked.connect(self.continueToResults)
+        self.saveButton.clicked.connect(self.saveValues)
+        
+        # The frames are rendered by worker processes while the VTK-animation plays, see 'showEvent'
+        if self.frameCache is not None:
+            self.frameCacheTimer = QtCore.QTimer(self)
+            self.frameCacheTimer.timeout.connect(self.pollFrameCache)
         
         #self.releaseKeyboard()
         
     def createPlots(self):
-        calculationValues = readFromJSON("assets/inputValues.json")
-        print("These values were read from the JSON-file containing input-values:")
-        print(calculationValues)
-        self.cycleAnalysis = schmidtAnalysis(calculationValues)
+        # Calculated once per session. A stored result, e.g. from 'resultstore.ResultStore', is shown without running the analysis.
+        self.cycleAnalysis = self.session.analysis()
         
-        self.analysisPlots = pg.plot()
-        self.analysisPlots.clear()
+        self.schmidtPlots = SchmidtPlots(self.cycleAnalysis)
+        self.canvas = self.schmidtPlots.canvas
+        self.plotMarkers = self.schmidtPlots.markers
         
-        self.plotMarkers = []
+        self.canvas.setFocusPolicy(QtCore.Qt.NoFocus)
         
-        createSchmidtPlots(self, self.cycleAnalysis)
+    def setSession(self, session):
+        """Shows another session, reusing the VTK-pipeline, the plots and the tuning panel of the window.
+
+        Args:
+            session (Session): The input-values to show.
+        """
         
-        self.canvas.setFocusPolicy(QtCore.Qt.NoFocus)
-        #self.analysisPlots.subplots_adjust(bottom=0.06, left=0.08, right=0.98, top=0.97)
+        self.liveAnalysis.discard()
+        self.session = session
+        self.cycleAnalysis = session.analysis()
+        self.schmidtPlots.update(self.cycleAnalysis)
+        self.tuningPanel.setParameters(session.parameters)
+        self.showPerformance()
+        self.requestUpdate(self._degree)
+    
+    def showAnalysis(self, generation, session):
+        """Shows the analysis of changed input-values. Results of outdated requests are dropped.
+
+        Args:
+            generation (int): The number of the request, see 'LiveAnalysis'.
+            session (Session): The changed input-values and their analysis.
+        """
         
-    @pyqtProperty(int)
+        if generation != self.liveAnalysis.generation:
+            return
+        
+        self.session = session
+        self.cycleAnalysis = session.cycleAnalysis
+        self.schmidtPlots.update(self.cycleAnalysis)
+        self.showPerformance()
+        self.tuningPanel.showLatency()
+    
+    def showPerformance(self):
+        # The loss corrections reuse the table of the Schmidt-analysis, so they are cheap enough for every update
+        self.tuningPanel.showPerformance(simpleAnalysis(self.session.values(), self.cycleAnalysis))
+    
+    @pyqtProperty(float)
     def degree(self):
         return self._degree
     
@@ -402,45 +631,120 @@ class StateWindow(QDialog):
     def degree(self, degree):
         if (degree != self._degree):
             self._degree = degree
-            self.updateValues(self._degree)
+            self.requestUpdate(degree)
             self.valueChanged.emit(degree)
+    
+    def setDegree(self, degree):
+        self.degree = degree
+    
+    def requestUpdate(self, degree, parts=("plots", "actors", "controls")):
+        """Marks parts of the window as outdated. All requests made during one event-loop turn
+        are applied together by a single call to 'flushUpdate'.
+
+        Args:
+            degree (int): The degree to show.
+            parts (tuple): The parts to update, any of 'plots', 'actors' and 'controls'.
+        """
+        
+        self._pendingDegree = degree
+        self._dirty.update(parts)
+        
+        if not self._flushScheduled:
+            self._flushScheduled = True
+            QtCore.QTimer.singleShot(0, self.flushUpdate)
+    
+    def flushUpdate(self):
+        """Applies the outdated parts for the latest requested degree, with exactly one VTK-render."""
+        
+        self._flushScheduled = False
+        
+        if self._dirty:
+            self.updateValues(self._pendingDegree, self._dirty)
+            self._dirty = set()
                         
-    def updateValues(self, degree):
-        """Updates the position for each vertex in the VTK-animation.
+    def updateValues(self, degree, parts=("plots", "actors", "controls")):
+        """Updates the plot-markers, the VTK-animation and the controls for a degree.
 
         Args:
             degree (int): The degree used to calculate the position.
+            parts (set): The parts to update, any of 'plots', 'actors' and 'controls'.
         """
         
-        self.updatePlots(degree)
-        self.updateActors(degree)
-        self.spinBox.setValue(degree)
-        self.progressBar.setValue(degree)
-        self.animation.setDuration(self.slider.value())
-        self.progressBar.setFormat("Degree: " + str(self._degree) + "\N{DEGREE SIGN}")
+        self.frameCount += 1
+        self.profiler.beginFrame()
+        
+        if "plots" in parts:
+            with self.profiler.stage("plots"):
+                self.updatePlots(degree)
+        
+        # The overlay shows the timings of the previous frames
+        if self.profiler.enabled and self.frameCount % 15 == 0:
+            self.profileOverlay.SetInput(self.profiler.overlayText())
+        
+        if "actors" in parts:
+            self.updateActors(degree)
+        
+        if "controls" in parts:
+            with self.profiler.stage("controls"):
+                # Setting the spin box must not request another update through 'showFrame'
+                self.spinBox.blockSignals(True)
+                self.spinBox.setValue(int(round(degree)))
+                self.spinBox.blockSignals(False)
+                self.progressBar.setValue(int(round(degree)))
+                self.progressBar.setFormat("Degree: " + str(int(round(degree))) + "\N{DEGREE SIGN}")
+                
+                # The frame rate is shown about once per second
+                if self.animation.frames % max(1, int(self.animation.targetFps)) == 0:
+                    self.fpsLabel.setText(str(round(self.animation.achievedFps())) + " FPS\n" + str(self.animation.droppedFrames) + " dropped")
+        
+        self.profiler.endFrame()
         
     def updateActors(self, degree):
-        """Updates the position for each vertex in the VTK-animation.
+        """Updates the position for each vertex in the VTK-animation and renders it.
 
         Args:
             degree (int): The degree used to calculate the position.
         """
         
-        self.leftPistonActor.SetPosition([0, self.stirlingAnimation.calculateHeight(degree)])
-        self.rightPistonActor.SetPosition([0, - self.stirlingAnimation.calculateHeight(degree)])
+        if self.cachedPlayback:
+            with self.profiler.stage("blit"):
+                image = self.frameCache.frame(degree)
+                if image is not None:
+                    self.frameView.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(image.data, image.shape[1], image.shape[0],
+                                                                                  3 * image.shape[1], QtGui.QImage.Format_RGB888)))
+                    return
         
-        self.expansionVolumeActor.SetMapper(self.stirlingAnimation.generateExpansionVolumeMapper(self.stirlingAnimation.calculateHeight(degree) + 1, self.stirlingAnimation.calculateColorScale(degree)))
-        self.compressionVolumeActor.SetMapper(self.stirlingAnimation.generateCompressionVolumeMapper(- self.stirlingAnimation.calculateHeight(degree) + 1, self.stirlingAnimation.calculateColorScale(-degree)))
+        with self.profiler.stage("actors"):
+            self.stirlingAnimation.updateActors(degree)
         
-        self.expansionPistonAnchorActor.SetMapper(self.stirlingAnimation.generateExpansionPistonAnchorMapper(degree))
-        self.compressionPistonAnchorActor.SetMapper(self.stirlingAnimation.generateCompressionPistonAnchorMapper(degree))
+        with self.profiler.stage("render"):
+            self.widget.GetRenderWindow().Render()
+    
+    def pollFrameCache(self):
+        """Collects the pre-rendered frames and switches to showing them once the cycle is complete."""
         
-        self.expansionPistonRodActor.SetMapper(self.stirlingAnimation.generateExpansionPistonRodMapper(degree))
-        self.compressionPistonRodActor.SetMapper(self.stirlingAnimation.generateCompressionPistonRodMapper(degree))
+        if not self.frameCache.poll():
+            return
         
-        self.ren.Render()
+        self.frameCacheTimer.stop()
+        
+        if self.frameCache.complete():
+            self.cachedPlayback = True
+            self.widget.hide()
+            self.frameView.show()
+            self.requestUpdate(self._degree, ("actors",))
+    
+    def countRender(self, caller=None, event=None):
+        self.renderCount += 1
+    
+    def rendersPerFrame(self):
+        """Returns the average number of VTK-renders per updated frame.
+
+        Returns:
+            float: The number of renders divided by the number of frames.
+        """
         
-        self.widget.update()
+        return self.renderCount / self.frameCount if self.frameCount else 0.0
             
     def updatePlots(self, degree):
         """Updates the degree-marker for each plot.
@@ -449,48 +753,208 @@ class StateWindow(QDialog):
             degree (int): The degree used to calculate the position.
         """
         
-        for marker in self.plotMarkers:
-            marker.setValue(degree)
+        self.schmidtPlots.setMarker(degree)
         
     def playAnimation(self):
-        self.animation.start()
+        self.animation.start(self._degree)
         
     def pauseAnimation(self):
         self.animation.pause()
     
     def showFrame(self):
         self._degree = self.spinBox.value()
-        self.updateValues(self._degree)
+        self.requestUpdate(self._degree)
+        
+        if not self.animation.isActive():
+            self.animation.start(self._degree)
+            self.animation.pause()
+    
+    def showEvent(self, a0: QtGui.QShowEvent) -> None:
+        self.animation.start(self._degree)
+        
+        if self.frameCache is not None and not self.cachedPlayback:
+            if self.frameCache.render():
+                self.pollFrameCache()
+            else:
+                self.frameCacheTimer.start(250)
+        
+        super().showEvent(a0)
+    
+    def hideEvent(self, a0: QtGui.QHideEvent) -> None:
+        # A hidden window does not animate or pre-render frames
+        self.animation.pause()
+        
+        if self.frameCache is not None:
+            self.frameCacheTimer.stop()
+            self.frameCache.cancel()
+        
+        if self.profiler.enabled and self.profiler.frames:
+            self.profiler.export(self.profileTracePath)
+            print("The frame profile is saved in: " + self.profileTracePath)
+        
+        super().hideEvent(a0)
             
     def getDegree(self):
         return self._degree
         
+    def saveValues(self):
+        # The values are only written when asked for, so separate instances do not overwrite each other's file
+        self.session.save()
+    
     def returnToIntro(self):
-        self.animation.stop()
-        self.intro = Intro(self)
-        self.intro.show()
-        self.hide()
+        self.intro = windowPool.navigate(self, Intro)
         
     def continueToResults(self):
-        self.animation.stop()
-        self.results = ResultWindow(self)
-        self.results.show()
-        self.hide()
+        self.results = windowPool.navigate(self, ResultWindow, self.session)
         
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
         super().closeEvent(a0)
-        self.widget.closeEvent()
-        self.canvas.closeEvent()
+        windowPool.release(self)
+    
+    def teardown(self):
+        """Stops the animation and the workers and releases the VTK-pipeline and its OpenGL-context.
+        The window is deleted afterwards.
+        """
+        
+        self.animation.stop()
+        self.liveAnalysis.shutdown()
+        
+        if self.frameCache is not None:
+            self.frameCacheTimer.stop()
+            self.frameCache.cancel()
+        
+        self.widget.GetRenderWindow().RemoveRenderer(self.ren)
         self.widget.Finalize()
+        self.canvas.close()
+        self.deleteLater()
+        
+class ReportJob(QtCore.QObject):
+    """Runs the analysis of the input-values and writes its PDF- and CSV-report in a pool of worker threads.
+    The PDF and the CSV are written concurrently once the analysis is done. Progress is reported with signals,
+    which are delivered in the thread of the window.
+    The files are written under temporary names and replace the report in 'results' only when both are complete,
+    so a cancelled job that is still writing never overwrites the report of a newer job.
+    """
+    
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+    
+    STEPS = 3
+    
+    # Held while a job replaces the report, so that a job cancelled before a newer job starts can not replace it afterwards
+    _publishLock = threading.Lock()
+    
+    def __init__(self, session, pdfFileName, csvFileName, parent=None, resultDirectory="results"):
+        super(ReportJob, self).__init__(parent)
+        self.session = session
+        self.pdfFileName = pdfFileName
+        self.csvFileName = csvFileName
+        self.resultDirectory = resultDirectory
+        self._temporarySuffix = "." + str(os.getpid()) + "." + str(id(self)) + ".tmp"
+        self._executor = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._completedSteps = 0
+    
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._executor.submit(self.analyse).add_done_callback(self.analysisDone)
+        self.progress.emit(0, "Calculating the analysis ...")
+    
+    def cancel(self):
+        """Stops the job. Steps that have not started are dropped, and running steps are ignored when they finish."""
+        
+        with self._publishLock:
+            self._cancelled.set()
         
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def isCancelled(self):
+        return self._cancelled.is_set()
+    
+    def analyse(self):
+        return self.session.analysis()
+    
+    def analysisDone(self, future):
+        if not self.stepDone(future, "Writing the PDF- and CSV-files ..."):
+            return
+        
+        cycleAnalysis = future.result()
+        
+        try:
+            self._executor.submit(plotSchmidtAnalysis, self.pdfFileName + self._temporarySuffix, cycleAnalysis,
+                                  self.resultDirectory).add_done_callback(self.reportDone)
+            self._executor.submit(writeResultsToCSV, self.csvFileName + self._temporarySuffix, cycleAnalysis,
+                                  self.resultDirectory).add_done_callback(self.reportDone)
+        except RuntimeError:
+            # The job was cancelled while the analysis finished
+            pass
+    
+    def reportDone(self, future):
+        if self.stepDone(future, "Writing the PDF- and CSV-files ...") == self.STEPS:
+            self._executor.shutdown(wait=False)
+            if self.publish():
+                self.finished.emit()
+    
+    def filePaths(self):
+        # Pairs of the temporary and the final path of the PDF and the CSV
+        return [(os.path.join(self.resultDirectory, fileName + self._temporarySuffix + extension),
+                 os.path.join(self.resultDirectory, fileName + extension))
+                for fileName, extension in [(self.pdfFileName, ".pdf"), (self.csvFileName, ".csv")]]
+    
+    def publish(self):
+        """Replaces the report with the written files, unless the job was cancelled. Returns True if it was replaced."""
+        
+        with self._publishLock:
+            if self.isCancelled():
+                self.removeTemporaryFiles()
+                return False
+            
+            for temporaryPath, filePath in self.filePaths():
+                os.replace(temporaryPath, filePath)
+        
+        return True
+    
+    def removeTemporaryFiles(self):
+        for temporaryPath, _ in self.filePaths():
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+    
+    def stepDone(self, future, message):
+        # Called in a worker thread when a step is done. Returns the number of completed steps, or 0 if the job stopped.
+        if self.isCancelled() or future.cancelled():
+            self.removeTemporaryFiles()
+            return 0
+        
+        if future.exception() is not None:
+            self.cancel()
+            self.removeTemporaryFiles()
+            self.failed.emit(str(future.exception()))
+            return 0
+        
+        with self._lock:
+            self._completedSteps += 1
+            completedSteps = self._completedSteps
+        
+        self.progress.emit(completedSteps, message)
+        
+        return completedSteps
+
 class ResultWindow(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, session=None):
         super(ResultWindow, self).__init__(parent)
+        if session is None:
+            session = Session.fromFile()
+        self.session = session
         window = QWidget()
         self.setWindowTitle("Results of analysis")
         
         # Create widgets
-        self.complete_message = QLabel("The analysis is complete.")
+        self.complete_message = QLabel("The analysis is running.")
         self.complete_message.setAlignment(QtCore.Qt.AlignCenter)
         self.complete_message.setFixedSize(500, 100)
         self.complete_message.setObjectName("complete_message")
@@ -498,16 +962,24 @@ class ResultWindow(QDialog):
         self.schmidtAnalysisFilename = "schmidtanalysis"
         self.schmidtResultsFilename = "schmidtanalysis"
 
-        self.result_message = QLabel("The plots are stored under 'results/" + self.schmidtAnalysisFilename + ".pdf'.")
+        self.result_message = QLabel("The plots will be stored under 'results/" + self.schmidtAnalysisFilename + ".pdf'.")
         self.result_message.setAlignment(QtCore.Qt.AlignCenter)
         self.result_message.setFixedSize(500, 100)
         self.result_message.setObjectName("result_message")
 
-        self.csv_message = QLabel("The results are stored under 'results/" + self.schmidtResultsFilename + ".csv'.")
+        self.csv_message = QLabel("The results will be stored under 'results/" + self.schmidtResultsFilename + ".csv'.")
         self.csv_message.setAlignment(QtCore.Qt.AlignCenter)
         self.csv_message.setFixedSize(500, 100)
         self.csv_message.setObjectName("result_message")
 
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setRange(0, ReportJob.STEPS)
+        self.progressBar.setValue(0)
+        self.progressBar.setFixedSize(500, 30)
+
+        self.cancelButton = QPushButton("Cancel")
+        self.cancelButton.setFixedSize(150, 50)
+        self.cancelButton.setFocusPolicy(QtCore.Qt.NoFocus)
         self.returnButton = QPushButton("Return")
         self.returnButton.setFixedSize(150, 50)
         self.returnButton.setFocusPolicy(QtCore.Qt.NoFocus)
@@ -515,57 +987,219 @@ class ResultWindow(QDialog):
         self.exitButton.setFixedSize(150, 50)
         self.exitButton.setFocusPolicy(QtCore.Qt.NoFocus)
         
-        # Create layout and add widgets
-        layout = QGridLayout(window)
-
-        # Calculate results
-        calculationValues = readFromJSON("assets/inputValues.json")
-        print("These values were read from the JSON-file containing input-values:")
-        print(calculationValues)
-        cycleAnalysis = schmidtAnalysis(calculationValues)
-
-        # Plot results
-        plotSchmidtAnalysis(self.schmidtAnalysisFilename, cycleAnalysis)
-
-        # Save results
-        writeResultsToCSV(self.schmidtResultsFilename, cycleAnalysis)
-        
         # Create layout and add widgets
         layout = QGridLayout(window)
         layout.addWidget(self.complete_message, 0, 0, 2, 5)
         
         layout.addWidget(self.result_message, 2, 0, 1, 5)
         layout.addWidget(self.csv_message, 3, 0, 1, 5)
+        layout.addWidget(self.progressBar, 4, 0, 1, 5)
         
-        layout.addWidget(self.returnButton, 4, 1, 1, 1)
-        layout.addWidget(self.exitButton, 4, 3, 1, 1)
+        layout.addWidget(self.returnButton, 5, 1, 1, 1)
+        layout.addWidget(self.cancelButton, 5, 2, 1, 1)
+        layout.addWidget(self.exitButton, 5, 3, 1, 1)
         
         # Set layout
         self.setLayout(layout)
         
         # Connect buttons
+        self.cancelButton.clicked.connect(self.cancelReport)
         self.returnButton.clicked.connect(self.returnToStateVisualization)
         self.exitButton.clicked.connect(self.exitApplication)
+        
+        self.reportJob = None
+        self.startReport()
+    
+    def startReport(self):
+        # Calculate, plot and save the results while the window is shown
+        # An outdated job may still be writing its temporary files. It is not parented to the window and is
+        # deleted once its workers release it, and its signals no longer reach the window.
+        if self.reportJob is not None:
+            self.reportJob.cancel()
+            self.reportJob.progress.disconnect(self.showProgress)
+            self.reportJob.finished.disconnect(self.showReport)
+            self.reportJob.failed.disconnect(self.showError)
+        
+        self.complete_message.setText("The analysis is running.")
+        self.result_message.setText("The plots will be stored under 'results/" + self.schmidtAnalysisFilename + ".pdf'.")
+        self.csv_message.setText("The results will be stored under 'results/" + self.schmidtResultsFilename + ".csv'.")
+        self.progressBar.setValue(0)
+        self.cancelButton.setEnabled(True)
+        
+        self.reportJob = ReportJob(self.session, self.schmidtAnalysisFilename, self.schmidtResultsFilename)
+        self.reportJob.progress.connect(self.showProgress)
+        self.reportJob.finished.connect(self.showReport)
+        self.reportJob.failed.connect(self.showError)
+        self.reportJob.start()
+    
+    def setSession(self, session):
+        self.session = session
+        self.startReport()
+    
+    def showProgress(self, step, message):
+        if self.sender() is self.reportJob and not self.reportJob.isCancelled():
+            self.progressBar.setValue(step)
+            self.progressBar.setFormat(message)
+    
+    def showReport(self):
+        if self.sender() is not self.reportJob:
+            return
+        
+        self.complete_message.setText("The analysis is complete.")
+        self.result_message.setText("The plots are stored under 'results/" + self.schmidtAnalysisFilename + ".pdf'.")
+        self.csv_message.setText("The results are stored under 'results/" + self.schmidtResultsFilename + ".csv'.")
+        self.progressBar.setFormat("Done")
+        self.cancelButton.setEnabled(False)
+    
+    def showError(self, message):
+        if self.sender() is not self.reportJob:
+            return
+        
+        self.complete_message.setText("The analysis failed: " + message)
+        self.progressBar.setFormat("Failed")
+        self.cancelButton.setEnabled(False)
+    
+    def cancelReport(self):
+        self.reportJob.cancel()
+        self.complete_message.setText("The analysis was cancelled.")
+        self.progressBar.setFormat("Cancelled")
+        self.cancelButton.setEnabled(False)
     
     def returnToStateVisualization(self):
-        self.stateVisualization = StateWindow(self)
-        self.stateVisualization.show()
-        self.hide()
+        self.stateVisualization = windowPool.navigate(self, StateWindow, self.session)
         
     def exitApplication(self):
+        self.reportJob.cancel()
         sys.exit()
+    
+    def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
+        super().closeEvent(a0)
+        windowPool.release(self)
+    
+    def teardown(self):
+        self.reportJob.cancel()
+        self.deleteLater()
+
+class WindowPool():
+    """Keeps one instance of each window. Navigating shows the existing window of a class with the new session
+    instead of creating a new window, so a long session does not accumulate windows, VTK-pipelines and OpenGL-contexts.
+    Windows are torn down explicitly when they are closed or the application quits.
+    """
+    
+    def __init__(self):
+        self.windows = {}
+    
+    def get(self, windowClass, session=None):
+        """Returns the window of a class, creating it on first use.
+
+        Args:
+            windowClass (type): The class of the window, e.g. 'StateWindow'.
+            session (Session): The session to show. A reused window is given the session with 'setSession'.
+
+        Returns:
+            QDialog: The window.
+        """
+        
+        window = self.windows.get(windowClass)
+        
+        if window is None:
+            window = windowClass() if session is None else windowClass(session=session)
+            self.windows[windowClass] = window
+        elif session is not None:
+            window.setSession(session)
+        
+        return window
+    
+    def navigate(self, current, windowClass, session=None):
+        """Shows the window of a class and hides the current window.
+
+        Args:
+            current (QDialog): The window navigated from.
+            windowClass (type): The class of the window to show.
+            session (Session): The session to show.
+
+        Returns:
+            QDialog: The shown window.
+        """
+        
+        window = self.get(windowClass, session)
+        window.show()
+        
+        if current is not window:
+            current.hide()
+        
+        return window
+    
+    def release(self, window):
+        """Removes a window from the pool and tears it down."""
+        
+        if self.windows.get(type(window)) is window:
+            del self.windows[type(window)]
+        
+        if hasattr(window, "teardown"):
+            window.teardown()
+    
+    def close(self):
+        for window in list(self.windows.values()):
+            self.release(window)
+
+windowPool = WindowPool()
+
+def openStoredRun(arguments):
+    """Opens the state window for a configuration of a stored sweep.
+
+    Args:
+        arguments (list): The sweep directory followed by input values as 'name=value', e.g. 'beta=90 Th=650'.
+
+    Returns:
+        StateWindow: The window showing the stored results.
+    """
+    
+    from resultstore import ResultStore
+    
+    store = ResultStore(arguments[0])
+    values = {name: float(value) for name, value in (argument.split("=", 1) for argument in arguments[1:])}
+    parameters, cycleAnalysis = store.lookup(**values)
+    
+    session = Session(EngineParameters(*(float(value) for value in parameters)), cycleAnalysis)
+    
+    return windowPool.get(StateWindow, session)
+
+class FirstPaintReporter(QtCore.QObject):
+    """Prints a line when the window it filters is first painted and quits the application.
+    Used by 'benchmark.py --startup' to measure the time to the first paint of 'Intro'.
+    """
+    
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Paint:
+            watched.removeEventFilter(self)
+            print("First paint", flush=True)
+            QtCore.QTimer.singleShot(0, QApplication.instance().quit)
+        
+        return False
 
 if __name__ == '__main__':
     # Create the Qt Application
     app = QApplication(sys.argv)
     
-    # Create and show the window
-    main = Intro()
+    # Create and show the window, or open a stored run with 'main.py --run DIRECTORY NAME=VALUE ...'
+    if len(sys.argv) > 2 and sys.argv[1] == "--run":
+        main = openStoredRun(sys.argv[2:])
+    else:
+        main = windowPool.get(Intro)
+    
+    if os.environ.get("STIRLING_STARTUP_BENCHMARK"):
+        firstPaintReporter = FirstPaintReporter()
+        main.installEventFilter(firstPaintReporter)
+    
     main.show()
     
     with open("style.qss", "r") as f:
         _style = f.read()
         app.setStyleSheet(_style)
         
+    # Windows are torn down before the application exits
+    app.aboutToQuit.connect(windowPool.close)
+    
     # Run the main Qt loop
     sys.exit(app.exec_())
\ No newline at end of file
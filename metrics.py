@@ -0,0 +1,75 @@
+import numpy as np
+from schmidt import parameterMatrix
+
+def cycleMetricsBatch(parameters, speed=600.0):
+    """
+    Computes the scalar results of a Schmidt-analysis for many engine configurations at once, from the closed-form
+    solution of the cycle instead of the table of 'schmidt.schmidtAnalysisBatch'. Only arrays of shape (N,) are allocated.
+    With the volumes of the Schmidt-analysis, the sum of V/T is S + C * sin(theta + phi), so the pressure is
+    P = K / (S * (1 + delta * sin(theta + phi))) with delta = C / S, and the integrals over the cycle have closed forms.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    'speed' Engine speed [rpm]
+    Output: 'metrics' Dict of Numpy arrays of shape (N,) containing:
+    'W_c', 'W_e', 'W' Indicated work of the compression space, the expansion space and the cycle [Nm]
+    'P_mean', 'P_max', 'P_min' Mean, highest and lowest pressure [N/mm^2]
+    'F_peak' Largest resulting piston force, F_O - F_U, by magnitude [N]
+    'power' Indicated power at 'speed' [W]
+    'efficiency' Work of the cycle per heat supplied to the expansion space.
+    Configurations where a working space vanishes, i.e. delta >= 1, give NaN.
+    """
+
+    values = parameterMatrix(parameters).T
+
+    R, m = values[0], values[1]
+    T_h = 273.15 + values[2]    # [K]
+    T_r = 273.15 + values[3]    # [K]
+    T_c = 273.15 + values[4]    # [K]
+    V_cyl, V_reg, V_c_avg = values[5], values[6], values[7]   # [mm^3]
+    piston_rod_area, piston_cyl_area = values[8], values[9]    # [mm^2]
+    beta = np.radians(values[10])
+
+    K = m * R * 1000
+    S = V_c_avg / T_c + V_reg / T_r + V_c_avg / T_h
+    A = V_cyl / (2 * T_c)
+    B = V_cyl / (2 * T_h)
+    C = np.hypot(A + B * np.cos(beta), B * np.sin(beta))
+    phi = np.arctan2(B * np.sin(beta), A + B * np.cos(beta))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        root = np.sqrt(1 - (C / S) ** 2)
+
+        # Integral of P * cos(theta + beta) over the cycle, per K
+        integral = 2 * np.pi / C * (1 - 1 / root)
+        W_c = K * V_cyl / 2 * np.sin(phi) * integral / 1000
+        W_e = K * V_cyl / 2 * -np.sin(beta - phi) * integral / 1000
+
+        P_max = K / (S - C)
+        P_min = K / (S + C)
+
+        # F_O - F_U falls with sin(theta + phi), and F_U acts half a revolution later, so the extremes are at sin(theta + phi) = -1 and 1
+        F_highest = P_max * piston_cyl_area - P_min * (piston_cyl_area - piston_rod_area)
+        F_lowest = P_min * piston_cyl_area - P_max * (piston_cyl_area - piston_rod_area)
+
+        W = W_c + W_e
+
+        return {
+            'W_c': W_c,
+            'W_e': W_e,
+            'W': W,
+            'P_mean': K / (S * root),
+            'P_max': P_max,
+            'P_min': P_min,
+            'F_peak': np.where(np.abs(F_highest) >= np.abs(F_lowest), F_highest, F_lowest),
+            'power': W * speed / 60,
+            'efficiency': W / W_e,
+        }
+
+def cycleMetrics(values, speed=600.0):
+    """
+    Computes the scalar results of a Schmidt-analysis of one configuration, see 'cycleMetricsBatch'.
+    Input: 'values' List of 11 values used for calculation
+    'speed' Engine speed [rpm]
+    Output: 'metrics' Dict of floats
+    """
+
+    return {name: float(value[0]) for name, value in cycleMetricsBatch([values], speed).items()}
@@ -0,0 +1,142 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import numpy as np
+
+class FrameProfiler():
+    """
+    Records the time spent in each stage of a frame, e.g. 'plots', 'actors' and 'render'.
+    The latest 'historyLength' frames are kept in a rolling history, which is summarized as percentiles and histograms
+    and can be exported as a JSON- or CSV-trace. A disabled profiler only costs a function call per stage.
+    """
+
+    def __init__(self, enabled=True, historyLength=600):
+        self.enabled = enabled
+        self.frames = deque(maxlen=historyLength)
+        self._current = None
+        self._frameStart = 0.0
+        self._frameNumber = 0
+
+    def beginFrame(self):
+        if not self.enabled:
+            return
+
+        self._current = {}
+        self._frameStart = time.perf_counter()
+
+    def endFrame(self):
+        if not self.enabled or self._current is None:
+            return
+
+        self._current['frame'] = (time.perf_counter() - self._frameStart) * 1000
+        self._current['number'] = self._frameNumber
+        self.frames.append(self._current)
+        self._frameNumber += 1
+        self._current = None
+
+    def stage(self, name):
+        """
+        Returns a context manager timing the code within it as a stage of the current frame.
+        Input: 'name' String naming the stage
+        """
+
+        if not self.enabled or self._current is None:
+            return nullcontext()
+
+        return self._timeStage(name)
+
+    @contextmanager
+    def _timeStage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def stages(self):
+        """
+        Output: 'stages' List of the names of the recorded stages, with the total frame time last
+        """
+
+        names = []
+        for frame in self.frames:
+            names.extend(name for name in frame if name not in names and name not in ('frame', 'number'))
+
+        return names + ['frame']
+
+    def timings(self, name):
+        """
+        Output: 'timings' Numpy array of the times of a stage in the rolling history [ms]
+        """
+
+        return np.array([frame.get(name, 0.0) for frame in self.frames])
+
+    def summary(self):
+        """
+        Output: 'summary' Dict mapping each stage to the mean, 50th, 95th and 99th percentile and maximum of its times [ms]
+        """
+
+        summary = {}
+        for name in self.stages():
+            timings = self.timings(name)
+            if len(timings) == 0:
+                continue
+            summary[name] = {
+                'mean': float(np.mean(timings)),
+                'p50': float(np.percentile(timings, 50)),
+                'p95': float(np.percentile(timings, 95)),
+                'p99': float(np.percentile(timings, 99)),
+                'max': float(np.max(timings)),
+            }
+
+        return summary
+
+    def histogram(self, name, bins=(0, 1, 2, 4, 8, 16, 33, 66, np.inf)):
+        """
+        Input: 'name' String naming the stage
+        'bins' Edges of the bins [ms]
+        Output: 'counts' Numpy array with the number of frames in each bin
+        'bins' Numpy array of the edges
+        """
+
+        counts, edges = np.histogram(self.timings(name), bins=np.asarray(bins, dtype=float))
+
+        return counts, edges
+
+    def overlayText(self):
+        """
+        Output: 'text' String with one line per stage and a histogram of the frame times, for an overlay on the animation
+        """
+
+        lines = []
+        for name, statistics in self.summary().items():
+            lines.append(name.ljust(8) + " p50 " + format(statistics['p50'], "6.2f") + "  p95 " + format(statistics['p95'], "6.2f") + " ms")
+
+        counts, edges = self.histogram('frame')
+        total = max(1, counts.sum())
+        for count, lower, upper in zip(counts, edges[:-1], edges[1:]):
+            label = (format(lower, "g") + "-" + format(upper, "g")) if np.isfinite(upper) else (">" + format(lower, "g"))
+            lines.append(label.rjust(6) + " ms " + "#" * int(round(20 * count / total)))
+
+        return "\n".join(lines)
+
+    def export(self, filePath):
+        """
+        Writes the recorded frames to a trace-file. '.csv'-files get one row per frame and one column per stage,
+        other files are written as JSON with the frames and the summary.
+        Input: 'filePath' String containing the path of the trace-file
+        """
+
+        names = self.stages()
+
+        if filePath.lower().endswith(".csv"):
+            with open(filePath, 'w', newline='') as traceFile:
+                writer = csv.writer(traceFile, delimiter=";")
+                writer.writerow(['number'] + names)
+                for frame in self.frames:
+                    writer.writerow([frame['number']] + [frame.get(name, 0.0) for name in names])
+        else:
+            with open(filePath, 'w') as traceFile:
+                json.dump({'frames': list(self.frames), 'summary': self.summary()}, traceFile, indent=1)
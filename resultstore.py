@@ -0,0 +1,110 @@
+import json
+import os
+import numpy as np
+from schmidt import PARAMETER_NAMES
+
+class ResultStore():
+    """
+    Read-only access to the results of a sweep written by 'sweep.runSweep'.
+    The results are memory-mapped, so a single configuration's table is read from disk without loading the rest of the file.
+    Configurations are looked up by their input values through the side index 'index.json', which holds the swept grid,
+    so that a lookup only computes the position in the grid. Stores without an index fall back to scanning the parameters.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        try:
+            self.parameters = np.load(os.path.join(directory, "parameters.npy"), mmap_mode='r')
+            self.results = np.load(os.path.join(directory, "results.npy"), mmap_mode='r')
+        except OSError:
+            raise Exception("Could not open the result store. Ensure '" + directory + "' contains a completed sweep.")
+
+        # 'results.npy' is created at full size when a sweep starts, so the tables of unfinished chunks are zeros
+        try:
+            with open(os.path.join(directory, "progress.json")) as progressFile:
+                progress = json.load(progressFile)
+        except (OSError, ValueError):
+            raise Exception("Could not open the result store. Ensure '" + directory + "' contains a completed sweep.")
+
+        chunks = -(-len(self.parameters) // progress['chunkSize'])
+        if len(set(progress['completed'])) < chunks:
+            raise Exception("The sweep in '" + directory + "' is not complete: " + str(len(set(progress['completed']))) + " of "
+                            + str(chunks) + " chunks are done. Resume it with 'sweep.py --resume'.")
+
+        self.index = None
+        indexPath = os.path.join(directory, "index.json")
+        if os.path.exists(indexPath):
+            with open(indexPath) as indexFile:
+                self.index = json.load(indexFile)
+
+    def __len__(self):
+        return len(self.parameters)
+
+    def find(self, **values):
+        """
+        Returns the indices of the configurations matching the given input values.
+        Input: 'values' Input values by name from 'schmidt.PARAMETER_NAMES', e.g. find(beta=90, Th=650). Inputs that are
+        not given match any value.
+        Output: 'indices' Sorted Numpy array of configuration-indices
+        """
+
+        unknown = [name for name in values if name not in PARAMETER_NAMES]
+        if unknown:
+            raise ValueError("Unknown parameters: " + ", ".join(unknown))
+
+        if self.index is None:
+            return self._scan(values)
+
+        axisPositions = []
+        for name, axisValues in zip(self.index['names'], self.index['axes']):
+            if name in values:
+                axisPositions.append(np.flatnonzero(np.isclose(axisValues, values[name], rtol=1e-9, atol=0)))
+            else:
+                axisPositions.append(np.arange(len(axisValues)))
+
+        for name, value in values.items():
+            if name not in self.index['names'] and not np.isclose(self.index['base'][PARAMETER_NAMES.index(name)], value, rtol=1e-9, atol=0):
+                return np.array([], dtype=np.int64)
+
+        if not axisPositions:
+            return np.arange(len(self))
+
+        grid = np.meshgrid(*axisPositions, indexing='ij')
+        shape = [len(axisValues) for axisValues in self.index['axes']]
+
+        return np.sort(np.ravel_multi_index([positions.ravel() for positions in grid], shape))
+
+    def table(self, index):
+        """
+        Returns the 'schmidtAnalysis'-matrix of one configuration as a read-only view into the memory-mapped file.
+        Input: 'index' Configuration-index
+        Output: 'cycleAnalysis' Numpy array of shape (angles, 16)
+        """
+
+        return self.results[index]
+
+    def lookup(self, **values):
+        """
+        Returns the input values and 'schmidtAnalysis'-matrix of the single configuration matching the given input values.
+        Input: 'values' Input values by name, see 'find'
+        Output: 'parameters' Numpy array of the 11 input values
+        'cycleAnalysis' Numpy array of shape (angles, 16)
+        """
+
+        indices = self.find(**values)
+
+        if len(indices) == 0:
+            raise KeyError("No configuration in the store matches " + str(values) + ".")
+        if len(indices) > 1:
+            raise KeyError(str(len(indices)) + " configurations in the store match " + str(values) + ". Give more input values.")
+
+        return self.parameters[indices[0]], self.table(indices[0])
+
+    def _scan(self, values):
+        matches = np.ones(len(self), dtype=bool)
+
+        for name, value in values.items():
+            matches &= np.isclose(self.parameters[:, PARAMETER_NAMES.index(name)], value, rtol=1e-9, atol=0)
+
+        return np.flatnonzero(matches)
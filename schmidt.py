@@ -1,19 +1,103 @@
 import os
-import random
-from turtle import color, width
-from matplotlib.axis import XAxis
-from matplotlib.lines import Line2D
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-import pyqtgraph as pg
-from matplotlib.backends.backend_pdf import PdfPages
 
-def schmidtAnalysis(values):
+# Order of the input values of an analysis, as returned by 'filemanager.readFromJSON'
+PARAMETER_NAMES = ["R", "m", "Th", "Tr", "Tc", "V_cyl", "V_reg", "V_c_avg", "piston_rod_area", "piston_cyl_area", "beta"]
+
+# Columns of the matrix returned by 'schmidtAnalysis'
+RESULT_COLUMNS = ["degree", "rad", "V_c", "V_e", "V_t", "Sum_V_div_T", "P_1", "P_2", "W_1", "W_2", "W_r", "F_o", "F_u", "F_r", "P_3", "P_4"]
+
+# Version of the results of 'schmidtAnalysisBatch'. Increase it whenever a change alters the results,
+# so that results cached on disk by 'cache.AnalysisCache' are calculated again.
+ANALYSIS_VERSION = 2
+
+def crankAngles(resolution=10, samples=None):
+    """
+    Returns the crank angles of one Stirling cycle, including both 0 and 360 degrees.
+    Input: 'resolution' Step between two crank angles in degrees. Must divide 360 degrees into a whole number of steps.
+    'samples' Number of steps per cycle. Overrides 'resolution' when given.
+    Output: 'degrees' Numpy array of 'samples' + 1 crank angles [degrees]
+    """
+
+    if samples is None:
+        if resolution <= 0:
+            raise ValueError("The resolution must be a positive number of degrees.")
+        samples = int(round(360 / resolution))
+        if samples < 1 or not np.isclose(samples * resolution, 360):
+            raise ValueError("The resolution must divide 360 degrees into a whole number of steps.")
+    elif int(samples) != samples or samples < 1:
+        raise ValueError("The number of samples must be a positive integer.")
+
+    return np.linspace(0, 360, int(samples) + 1)
+
+def phaseShift(values, shift):
+    """
+    Shifts a periodic column of a cycle by a given number of degrees, i.e. returns the values at 'degree + shift'.
+    Input: 'values' Numpy array with one value for each crank angle from 'crankAngles', the last equal to the first
+    'shift' Phase shift in degrees. Shifts that do not land on the grid are linearly interpolated.
+    Output: 'shifted' Numpy array with the same shape as 'values'
+    """
+
+    samples = values.shape[-1] - 1
+    steps = (shift % 360) * samples / 360
+    lower = int(np.floor(steps))
+    fraction = steps - lower
+    index = np.arange(samples + 1)
+
+    shifted = values[..., (index + lower) % samples]
+    if not np.isclose(fraction, 0):
+        shifted = (1 - fraction) * shifted + fraction * values[..., (index + lower + 1) % samples]
+
+    return shifted
+
+def parameterMatrix(parameters):
+    """
+    Converts engine configurations to a matrix with one row per configuration and one column per input.
+    Input: 'parameters' Either an array-like of shape (N, 11) ordered as 'PARAMETER_NAMES', a single list of 11 values,
+    or named columns (a dict or a structured Numpy array) containing every name in 'PARAMETER_NAMES'
+    Output: 'parameterMatrix' Numpy array of shape (N, 11)
+    """
+
+    names = getattr(getattr(parameters, 'dtype', None), 'names', None)
+    if isinstance(parameters, dict) or names is not None:
+        missing = [name for name in PARAMETER_NAMES if name not in (parameters.keys() if names is None else names)]
+        if missing:
+            raise ValueError("Missing named columns: " + ", ".join(missing))
+        columns = np.broadcast_arrays(*[np.asarray(parameters[name], dtype=float) for name in PARAMETER_NAMES])
+        return np.stack([np.ravel(column) for column in columns], axis=-1)
+
+    matrix = np.atleast_2d(np.asarray(parameters, dtype=float))
+    if matrix.ndim != 2 or matrix.shape[1] != len(PARAMETER_NAMES):
+        raise ValueError("The parameters must have the shape (N, " + str(len(PARAMETER_NAMES)) + ").")
+    return matrix
+
+def schmidtAnalysis(values, resolution=10, samples=None):
     """
     Performs a Schmidt-analysis and returns a matrix containing the results of the analysis.
     Input: 'values' List of values used for calculation [R, m, Th_c, Tr_c, Tc_c, V_cyl, V_reg, V_c_avg, piston_rod_area, piston_cyl_area, phaseAngle_beta]
-    Output: 'cycleAnalysis' Matrix of results
+    'resolution' Step between two crank angles in degrees (e.g. 10, 1 or 0.1)
+    'samples' Number of steps per cycle. Overrides 'resolution' when given.
+    Output: 'cycleAnalysis' Matrix of results with one row per crank angle from 0 to 360 degrees. The work columns depend
+    on the resolution, see 'schmidtAnalysisBatch'.
+    """
+
+    return schmidtAnalysisBatch([values], resolution, samples)[0]
+
+def schmidtAnalysisBatch(parameters, resolution=10, samples=None):
+    """
+    Performs a Schmidt-analysis of many engine configurations at once using broadcasting.
+    Input: 'parameters' Engine configurations, see 'parameterMatrix'
+    'resolution' Step between two crank angles in degrees (e.g. 10, 1 or 0.1)
+    'samples' Number of steps per cycle. Overrides 'resolution' when given.
+    Output: 'cycleAnalyses' Numpy array of shape (N, angles, 16), one 'schmidtAnalysis'-matrix per configuration.
+    The work columns W_1, W_2 and W_r are the work of each step, so they scale with the step between the crank angles:
+    at 1 degree they are a tenth of those at the default 10 degrees.
     """
+
+    # Each input is a column vector, so that it broadcasts against the row of crank angles
+    values = parameterMatrix(parameters).T[:, :, np.newaxis]
+
     # Constants
     R = values[0]   # [J/kg*K]
     m = values[1]   # [kg]
@@ -39,261 +123,283 @@ def schmidtAnalysis(values):
     beta = values[10]   # [degrees]
     beta_rad = beta * 2 * np.pi / 360
 
-    degree = 0
-    cycleAnalysis = np.zeros((37, 16))
-
-    for i in range(37):
-        cycleAnalysis[i,0] = degree         # [degrees]
-        rad = degree * 2 * np.pi / 360
-        cycleAnalysis[i,1] = rad            # [rad]
-        V_c = V_c_avg + np.sin(rad) * V_cyl / 2
-        cycleAnalysis[i,2] = V_c            # [mm^3]
-        V_e = V_c_avg + np.sin(rad + beta_rad) * V_cyl / 2
-        cycleAnalysis[i,3] = V_e            # [mm^3]
-        V_t = (V_c + V_e) / 1000000
-        cycleAnalysis[i,4] = V_t            # [dm^3]
-        Sum_V_div_T = (V_c / T_c) + (V_reg / T_r) + (V_e / T_h)
-        cycleAnalysis[i,5] = Sum_V_div_T    # [mm^3/K]
-        P_1 = m * R * 1000 / Sum_V_div_T
-        cycleAnalysis[i,6] = P_1            # [N/mm^2]
-
-        degree += 10
-
-    # Assigning P_2 [N/mm^2]
-    cycleAnalysis[:18,7] = cycleAnalysis[19:,6]
-    cycleAnalysis[18:,7] = cycleAnalysis[:19,6]
-
-    for i in range(1,37):
-        W_1 = P_1 * (cycleAnalysis[i,2] - cycleAnalysis[i-1,2]) / 1000
-        cycleAnalysis[i,8] = W_1            # [Nm]
-        W_2 = P_1 * (cycleAnalysis[i,3] - cycleAnalysis[i-1,3]) / 1000
-        cycleAnalysis[i,9] = W_2            # [Nm]
-        W_r = W_1 + W_2
-        cycleAnalysis[i,10] = W_r           # [Nm]
-        F_o = cycleAnalysis[i,6] * piston_cyl_area
-        cycleAnalysis[i,11] = F_o           # [N]
-        F_u = cycleAnalysis[i,7] * (piston_cyl_area - piston_rod_area)
-        cycleAnalysis[i,12] = F_u           # [N]
-        F_r = F_o - F_u
-        cycleAnalysis[i,13] = F_r           # [N]
+    degrees = crankAngles(resolution, samples)
+    cycleAnalyses = np.zeros((values.shape[1], len(degrees), 16))
+
+    rad = degrees * 2 * np.pi / 360
+    V_c = V_c_avg + np.sin(rad) * V_cyl / 2
+    V_e = V_c_avg + np.sin(rad + beta_rad) * V_cyl / 2
+    Sum_V_div_T = (V_c / T_c) + (V_reg / T_r) + (V_e / T_h)
+    P_1 = m * R * 1000 / Sum_V_div_T
+
+    cycleAnalyses[:,:,0] = degrees                  # [degrees]
+    cycleAnalyses[:,:,1] = rad                      # [rad]
+    cycleAnalyses[:,:,2] = V_c                      # [mm^3]
+    cycleAnalyses[:,:,3] = V_e                      # [mm^3]
+    cycleAnalyses[:,:,4] = (V_c + V_e) / 1000000    # [dm^3]
+    cycleAnalyses[:,:,5] = Sum_V_div_T              # [mm^3/K]
+    cycleAnalyses[:,:,6] = P_1                      # [N/mm^2]
+
+    # Assigning P_2 [N/mm^2], the pressure half a revolution ahead
+    cycleAnalyses[:,:,7] = phaseShift(P_1, 180)
+
+    # The work is calculated with the pressure at the end of the cycle
+    W_1 = P_1[:,-1:] * np.diff(V_c) / 1000
+    W_2 = P_1[:,-1:] * np.diff(V_e) / 1000
+    F_o = P_1[:,1:] * piston_cyl_area
+    F_u = cycleAnalyses[:,1:,7] * (piston_cyl_area - piston_rod_area)
+
+    cycleAnalyses[:,1:,8] = W_1                     # [Nm]
+    cycleAnalyses[:,1:,9] = W_2                     # [Nm]
+    cycleAnalyses[:,1:,10] = W_1 + W_2              # [Nm]
+    cycleAnalyses[:,1:,11] = F_o                    # [N]
+    cycleAnalyses[:,1:,12] = F_u                    # [N]
+    cycleAnalyses[:,1:,13] = F_o - F_u              # [N]
 
     # Assigning P_3 and P_4 [N/mm^2]
-    cycleAnalysis[:29,14] = cycleAnalysis[8:,6]
-    cycleAnalysis[29:,14] = cycleAnalysis[:8,6]
-    cycleAnalysis[:19,15] = cycleAnalysis[18:,14]
-    cycleAnalysis[18:,15] = cycleAnalysis[:19,14]
+    cycleAnalyses[:,:,14] = phaseShift(P_1, 80)
+    cycleAnalyses[:,:,15] = phaseShift(cycleAnalyses[:,:,14], 180)
     
-    return cycleAnalysis
+    return cycleAnalyses
 
-def plotSchmidtAnalysis(resultFileName, cycleAnalysis):
+class SchmidtReport():
+    '''
+    Renders the PDF-report of a Schmidt-analysis. The four figures are built once with the object-oriented Figure-API
+    on the Agg-canvas, and only the data of the lines and areas is replaced for each new result.
+    A report does not use the global state of 'pyplot', so separate instances can render concurrently in separate threads.
+    '''
+
+    def __init__(self):
+        self.figures = []
+        xTicks = np.arange(0, 390, 30)
+
+        # Volume variation
+        volumeAxes = self._addAxes("Volume variation", "Volume [mm3]", xTicks, np.arange(0, 32500000, 2500000), (0, 30000000))
+        self.expansionArea = volumeAxes.fill_between([0, 360], [0, 0], color='lightskyblue', label="Expansion volume", zorder=2)
+        self.compressionArea = volumeAxes.fill_between([0, 360], [0, 0], color='indianred', label="Compression volume", zorder=3)
+        volumeAxes.legend()
+
+        # Circuit pressure
+        pressureAxes = self._addAxes("Pressure variation", "Pressure [N/mm2]", xTicks, np.arange(0, 22, 2), (0, 20))
+        self.pressureLines = [pressureAxes.plot([], [], color=color, label=label)[0]
+                              for color, label in [('b', "P_1"), ('r', "P_2"), ('g', "P_3"), ('y', "P_4")]]
+        pressureAxes.legend()
+
+        # Mechanical work
+        workAxes = self._addAxes("Work variation", "Work [kNm]", xTicks, np.arange(-25, 25, 2.5), (-20, 20))
+        self.workLines = [workAxes.plot([], [], color=color, label=label)[0]
+                          for color, label in [('b', "W_1"), ('r', "W_2"), ('g', "W_R")]]
+        workAxes.legend()
+
+        # Piston forces
+        forceAxes = self._addAxes("Force variation", "Force [kN]", xTicks, np.arange(-500, 1750, 250), (-500, 1500))
+        self.forceLines = [forceAxes.plot([], [], color=color, label=label)[0]
+                           for color, label in [('b', "F_O"), ('r', "F_U"), ('g', "F_R")]]
+        forceAxes.legend()
+
+    def _addAxes(self, title, yLabel, xTicks, yTicks, yLimits):
+        # Imported here, so that the analysis can be used without loading matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+
+        axes.set_xticks(xTicks)
+        axes.set_xlabel("Degrees")
+        axes.set_yticks(yTicks)
+        axes.set_ylabel(yLabel)
+        axes.set_title(title)
+        axes.set_xlim(0, 360)
+        axes.set_ylim(*yLimits)
+        axes.grid()
+
+        self.figures.append(figure)
+
+        return axes
+
+    def _setArea(self, area, x, y):
+        # Outline of the area between the curve and zero
+        area.set_verts([np.column_stack([np.concatenate([x, x[::-1]]), np.concatenate([y, np.zeros_like(y)])])])
+
+    def render(self, filePath, cycleAnalysis):
+        '''
+        Writes the report of a Schmidt-analysis to a PDF-file.
+        Input: 'filePath' String containing the path of the PDF-file, including '.pdf'.
+        'cycleAnalysis' Numpy array containing calculated results from the Schmidt-analysis.
+        '''
+
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        degrees = cycleAnalysis[:,0]
+
+        self._setArea(self.expansionArea, degrees, cycleAnalysis[:,2] + cycleAnalysis[:,3])
+        self._setArea(self.compressionArea, degrees, cycleAnalysis[:,2])
+
+        for line, column in zip(self.pressureLines, [6, 7, 14, 15]):
+            line.set_data(degrees, cycleAnalysis[:,column])
+
+        for line, column in zip(self.workLines, [8, 9, 10]):
+            line.set_data(degrees[1:], cycleAnalysis[1:,column] / 1000)
+
+        for line, column in zip(self.forceLines, [11, 12, 13]):
+            line.set_data(degrees[1:], cycleAnalysis[1:,column] / 1000)
+
+        with PdfPages(filePath) as pdfPages:
+            for figure in self.figures:
+                pdfPages.savefig(figure)
+
+# One report per thread, reused for every report rendered by that thread
+_reports = threading.local()
+
+def plotSchmidtAnalysis(resultFileName, cycleAnalysis, resultDirectory="results"):
     '''
     Plots results from a Schmidt-analysis. Volume, pressure, mechanical work, and forces are plotted against the number of degrees for one Stirling cycle.
     Input: 'resultFileName' String containing the desired path for a PDF containing the plots. Must not include path or '.pdf'.
     'cycleAnalysis' Numpy array containing calculated results from the Schmidt-analysis.
+    'resultDirectory' String containing the directory of the PDF.
     '''
 
+    filePath = os.path.join(resultDirectory, resultFileName + ".pdf")
+
     # Removes result-file if it exists
-    if os.path.exists("results/" + resultFileName + ".pdf"):
-        os.remove("results/" + resultFileName + ".pdf")
+    if os.path.exists(filePath):
+        os.remove(filePath)
 
-    pdfPages = PdfPages("results/" + resultFileName + ".pdf")
-    plt.figure()
-    plt.clf()
+    if not hasattr(_reports, 'report'):
+        _reports.report = SchmidtReport()
 
-    # Plot volume variation
-    plt.fill_between(cycleAnalysis[:,0], cycleAnalysis[:,2] + cycleAnalysis[:,3], color='lightskyblue', label="Expansion volume", zorder=2)
-    plt.fill_between(cycleAnalysis[:,0], cycleAnalysis[:,2], color='indianred', label="Compression volume", zorder=3)
-    
-    plt.xticks(np.arange(0, 390, 30))
-    plt.xlabel("Degrees")
-    plt.yticks(np.arange(0, 32500000, 2500000))
-    plt.ylabel("Volume [mm3]")
-    plt.title("Volume variation")
-    plt.margins(x=0)
-    plt.ylim(0, 30000000)
-    plt.grid()
-    plt.legend()
-
-    pdfPages.savefig()
-
-    # Plot circuit pressure
-    plt.figure()
-    plt.clf()
-
-    plt.plot(cycleAnalysis[:,0], cycleAnalysis[:,6], color='b', label="P_1")
-    plt.plot(cycleAnalysis[:,0], cycleAnalysis[:,7], color='r', label="P_2")
-    plt.plot(cycleAnalysis[:,0], cycleAnalysis[:,14], color='g', label="P_3")
-    plt.plot(cycleAnalysis[:,0], cycleAnalysis[:,15], color='y', label="P_4")
-
-    plt.xticks(np.arange(0, 390, 30))
-    plt.xlabel("Degrees")
-    plt.yticks(np.arange(0, 22, 2))
-    plt.ylabel("Pressure [N/mm2]")
-    plt.title("Pressure variation")
-    plt.margins(x=0)
-    plt.ylim(0, 20)
-    plt.grid()
-    plt.legend()
-
-    pdfPages.savefig()
-
-    # Plot mechanical work
-    plt.figure()
-    plt.clf()
-
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,8] / 1000, color='b', label="W_1")
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,9] / 1000, color='r', label="W_2")
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,10] / 1000, color='g', label="W_R")
-
-    plt.xticks(np.arange(0, 390, 30))
-    plt.xlabel("Degrees")
-    plt.yticks(np.arange(-25, 25, 2.5))
-    plt.ylabel("Work [kNm]")
-    plt.title("Work variation")
-    plt.margins(x=0)
-    plt.xlim(0, 360)
-    plt.ylim(-20, 20)
-    plt.grid()
-    plt.legend()
-
-    pdfPages.savefig()
-
-    # Plot piston forces
-    plt.figure()
-    plt.clf()
-
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,11] / 1000, color='b', label="F_O")
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,12] / 1000, color='r', label="F_U")
-    plt.plot(cycleAnalysis[1:,0], cycleAnalysis[1:,13] / 1000, color='g', label="F_R")
-
-    plt.xticks(np.arange(0, 390, 30))
-    plt.xlabel("Degrees")
-    plt.yticks(np.arange(-500, 1750, 250))
-    plt.ylabel("Force [kN]")
-    plt.title("Force variation")
-    plt.margins(x=0)
-    plt.xlim(0, 360)
-    plt.ylim(-500, 1500)
-    plt.grid()
-    plt.legend()
-
-    pdfPages.savefig()
-
-    pdfPages.close()
+    _reports.report.render(filePath, cycleAnalysis)
     
+class SchmidtPlots():
+    '''
+    The live plots of a Schmidt-analysis in a pyqtgraph-widget, with a degree-marker in each plot.
+    The curves are created once, and 'update' replaces their data in place, so a new result does not rebuild the widget.
+    The y-axes keep their default range and are only widened when the data leaves the current view.
+    '''
+
+    # Default y-range of the volume, pressure, work and force plots
+    Y_RANGES = [(0, 30000000), (0, 20), (-20, 20), (-500, 1500)]
+
+    def __init__(self, cycleAnalysis=None):
+        # Imported here, so that the analysis can be used without a GUI toolkit
+        import pyqtgraph as pg
+
+        self.canvas = pg.GraphicsLayoutWidget(size=(1000, 800))
+        #self.canvas.resize(1500, 880)
+        self.canvas.setBackground('w')
+        self.markers = []
+
+        # Volume variation
+        volumeVariation = self._addPlot(pg, "Volume variation", "Volume variation", "Volume [mm3]")
+        self.compressionCurve = pg.PlotCurveItem(pen=pg.mkColor(205, 92, 92), name="Compression area")
+        self.expansionCurve = pg.PlotCurveItem(pen=pg.mkColor(135, 206, 250), name="Expansion area")
+        self.horizontalLine = pg.PlotCurveItem()
+        volumeVariation.addItem(self.compressionCurve)
+        volumeVariation.addItem(self.expansionCurve)
+        volumeVariation.addItem(pg.FillBetweenItem(self.horizontalLine, self.compressionCurve, pg.mkColor(205, 92, 92)))
+        volumeVariation.addItem(pg.FillBetweenItem(self.compressionCurve, self.expansionCurve, pg.mkColor(135, 206, 250)))
+
+        # Circuit pressure
+        circuitPressure = self._addPlot(pg, "Circuit pressure", "Circuit pressure", "Pressure [N/mm2]")
+        self.pressureCurves = self._addCurves(pg, circuitPressure, [('b', "P_1"), ('r', "P_2"), ('g', "P_3"), ('y', "P_4")])
+
+        # Mechanical work
+        mechanicalWork = self._addPlot(pg, "Mechanical work", "Mechanical work", "Work [kNm]", row=2, col=0)
+        self.workCurves = self._addCurves(pg, mechanicalWork, [('b', "W_1"), ('r', "W_2"), ('g', "W_3")])
+
+        # Piston forces
+        pistonForces = self._addPlot(pg, "PistonForces", "PistonForces", "Force [kN]", row=2, col=1)
+        self.forceCurves = self._addCurves(pg, pistonForces, [('b', "F_O"), ('r', "F_U"), ('g', "F_R")])
+
+        self.plots = [volumeVariation, circuitPressure, mechanicalWork, pistonForces]
+        for plot, yRange in zip(self.plots, self.Y_RANGES):
+            plot.setYRange(*yRange, padding=0)
+
+            # Added last, so that the marker is drawn on top of the curves
+            marker = pg.InfiniteLine(pen=pg.mkPen('k', width=3))
+            plot.addItem(marker)
+            self.markers.append(marker)
+
+        #self.canvas.ci.layout.setRowStretchFactor(0, 4)
+        #self.canvas.ci.layout.setRowStretchFactor(1, 1)
+        #self.canvas.ci.layout.setColumnStretchFactor(0, 1)
+        #self.canvas.ci.layout.setColumnStretchFactor(1, 1)
+        #self.canvas.ci.layout.setColumnMaximumWidth(0,100)
+        #self.canvas.ci.layout.setColumnMaximumWidth(1,100)
+        self.canvas.ci.layout.setContentsMargins(10, 0, 30, 10)
+
+        if cycleAnalysis is not None:
+            self.update(cycleAnalysis)
+
+    def _addPlot(self, pg, name, title, yLabel, **position):
+        plot = self.canvas.addPlot(name=name, title=title, **position)
+        plot.addLegend()
+
+        plot.setXRange(0, 360, padding=0)
+        plot.setLabel('bottom', "Degrees")
+        plot.setLabel('left', yLabel)
+
+        # Set spacing of values along the x-axis
+        plot.getAxis('bottom').setTicks([[(degree, str(degree)) for degree in range(0, 420, 60)]])
+
+        return plot
+
+    def _addCurves(self, pg, plot, styles):
+        curves = [pg.PlotCurveItem(pen=pen, name=name) for pen, name in styles]
+        for curve in curves:
+            plot.addItem(curve)
+
+        return curves
+
+    def update(self, cycleAnalysis):
+        '''
+        Replaces the data of the curves with a new result.
+        Input: 'cycleAnalysis' Numpy array containing calculated results from the Schmidt-analysis.
+        '''
+
+        degrees = cycleAnalysis[:,0]
+
+        self.horizontalLine.setData(degrees, np.zeros_like(degrees))
+        self.compressionCurve.setData(degrees, cycleAnalysis[:,2])
+        self.expansionCurve.setData(degrees, cycleAnalysis[:,2] + cycleAnalysis[:,3])
+
+        for curve, column in zip(self.pressureCurves, [6, 7, 14, 15]):
+            curve.setData(degrees, cycleAnalysis[:,column])
+
+        for curve, column in zip(self.workCurves, [8, 9, 10]):
+            curve.setData(degrees[1:], cycleAnalysis[1:,column] / 1000)
+
+        for curve, column in zip(self.forceCurves, [11, 12, 13]):
+            curve.setData(degrees[1:], cycleAnalysis[1:,column] / 1000)
+
+        plottedValues = [cycleAnalysis[:,2] + cycleAnalysis[:,3], cycleAnalysis[:,[6, 7, 14, 15]],
+                         cycleAnalysis[1:,8:11] / 1000, cycleAnalysis[1:,11:14] / 1000]
+
+        for plot, values, defaultRange in zip(self.plots, plottedValues, self.Y_RANGES):
+            self._fitRange(plot, values, defaultRange)
+
+    def _fitRange(self, plot, values, defaultRange):
+        # The range is only changed when the data leaves the current view, and then covers the default range and the data
+        lower, upper = plot.viewRange()[1]
+        minimum, maximum = float(np.min(values)), float(np.max(values))
+
+        if minimum < lower or maximum > upper:
+            defaultLower, defaultUpper = defaultRange
+            plot.setYRange(min(defaultLower, minimum), max(defaultUpper, maximum), padding=0.05)
+
+    def setMarker(self, degree):
+        '''
+        Moves the degree-marker of each plot.
+        Input: 'degree' Crank angle in degrees
+        '''
+
+        for marker in self.markers:
+            marker.setValue(degree)
+
 def createSchmidtPlots(window, cycleAnalysis):
-    window.canvas = pg.GraphicsLayoutWidget(size=(1000, 800))
-    #window.canvas.resize(1500, 880)
-    window.canvas.setBackground('w')
-    
-    # Set spacing of values along the x-axis
-    xAxis = [
-        (0, "0"),
-        (60, "60"),
-        (120, "120"),
-        (180, "180"),
-        (240, "240"),
-        (300, "300"),
-        (360, "360"),
-    ]
-    
-    # Volume variation
-    volumeVariation = window.canvas.addPlot(name="Volume variation", title="Volume variation")
-    volumeVariation.addLegend()
-    compressionCurve = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,2], pen=pg.mkColor(205, 92, 92), name="Compression area")
-    expansionCurve = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,2] + cycleAnalysis[:,3], pen=pg.mkColor(135, 206, 250), name="Expansion area")
-    horizontalLine = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=np.zeros_like(cycleAnalysis[:,0]))
-    filledCompressionArea = pg.FillBetweenItem(horizontalLine, compressionCurve, pg.mkColor(205, 92, 92))
-    filledTotalArea = pg.FillBetweenItem(compressionCurve, expansionCurve, pg.mkColor(135, 206, 250))
-    volumeVariation.addItem(compressionCurve)
-    volumeVariation.addItem(expansionCurve)
-    volumeVariation.addItem(filledCompressionArea)
-    volumeVariation.addItem(filledTotalArea)
-    
-    volumeVariationMarker = pg.InfiniteLine(pen=pg.mkPen('k', width=3))
-    volumeVariation.addItem(volumeVariationMarker)
-    window.plotMarkers.append(volumeVariationMarker)
-    
-    volumeVariation.setXRange(0, 360, padding=0)
-    volumeVariation.setYRange(0, 30000000, padding=0)
-    
-    volumeVariation.setLabel('bottom', "Degrees")
-    volumeVariation.setLabel('left', "Volume [mm3]")
-    
-    volumeVariation.getAxis('bottom').setTicks([xAxis])
-    
-    # Circuit pressure
-    circuitPressure = window.canvas.addPlot(name="Circuit pressure", title="Circuit pressure")
-    circuitPressure.addLegend()
-    p1 = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,6], pen='b', name="P_1")
-    p2 = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,7], pen='r', name="P_2")
-    p3 = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,14], pen='g', name="P_3")
-    p4 = pg.PlotCurveItem(x=cycleAnalysis[:,0], y=cycleAnalysis[:,15], pen='y', name="P_4")
-    circuitPressure.addItem(p1)
-    circuitPressure.addItem(p2)
-    circuitPressure.addItem(p3)
-    circuitPressure.addItem(p4)
-    
-    circuitPressureMarker = pg.InfiniteLine(pen=pg.mkPen('k', width=3))
-    circuitPressure.addItem(circuitPressureMarker)
-    window.plotMarkers.append(circuitPressureMarker)
-    
-    circuitPressure.setXRange(0, 360, padding=0)
-    circuitPressure.setYRange(0, 20, padding=0)
-    
-    circuitPressure.setLabel('bottom', "Degrees")
-    circuitPressure.setLabel('left', "Pressure [N/mm2]")
-    
-    circuitPressure.getAxis('bottom').setTicks([xAxis])
-    
-    # Mechanical work
-    mechanicalWork = window.canvas.addPlot(name="Mechanical work", title="Mechanical work", row=2, col=0)
-    mechanicalWork.addLegend()
-    w1 = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,8] / 1000, pen='b', name="W_1")
-    w2 = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,9] / 1000, pen='r', name="W_2")
-    w3 = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,10] / 1000, pen='g', name="W_3")
-    mechanicalWork.addItem(w1)
-    mechanicalWork.addItem(w2)
-    mechanicalWork.addItem(w3)
-    
-    mechanicalWorkMarker = pg.InfiniteLine(pen=pg.mkPen('k', width=3))
-    mechanicalWork.addItem(mechanicalWorkMarker)
-    window.plotMarkers.append(mechanicalWorkMarker)
-    
-    mechanicalWork.setXRange(0, 360, padding=0)
-    mechanicalWork.setYRange(-20, 20, padding=0)
-    
-    mechanicalWork.setLabel('bottom', "Degrees")
-    mechanicalWork.setLabel('left', "Work [kNm]")
-    
-    mechanicalWork.getAxis('bottom').setTicks([xAxis])
-    
-    # Piston forces
-    pistonForces = window.canvas.addPlot(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,11] / 1000, name="PistonForces", title="PistonForces", row=2, col=1)
-    pistonForces.addLegend()
-    fo = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,11] / 1000, pen='b', name="F_O")
-    fu = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,12] / 1000, pen='r', name="F_U")
-    fr = pg.PlotCurveItem(x=cycleAnalysis[1:,0], y=cycleAnalysis[1:,13] / 1000, pen='g', name="F_R")
-    pistonForces.addItem(fo)
-    pistonForces.addItem(fu)
-    pistonForces.addItem(fr)
-    
-    pistonForcesMarker = pg.InfiniteLine(pen=pg.mkPen('k', width=3))
-    pistonForces.addItem(pistonForcesMarker)
-    window.plotMarkers.append(pistonForcesMarker)
-    
-    pistonForces.setXRange(0, 360, padding=0)
-    pistonForces.setYRange(-500, 1500, padding=0)
-    
-    pistonForces.setLabel('bottom', "Degrees")
-    pistonForces.setLabel('left', "Force [kN]")
-    
-    pistonForces.getAxis('bottom').setTicks([xAxis])
-    
-    #window.canvas.ci.layout.setRowStretchFactor(0, 4)
-    #window.canvas.ci.layout.setRowStretchFactor(1, 1)
-    #window.canvas.ci.layout.setColumnStretchFactor(0, 1)
-    #window.canvas.ci.layout.setColumnStretchFactor(1, 1)
-    #window.canvas.ci.layout.setColumnMaximumWidth(0,100)
-    #window.canvas.ci.layout.setColumnMaximumWidth(1,100)
-    window.canvas.ci.layout.setContentsMargins(10, 0, 30, 10)
\ No newline at end of file
+    # Kept for windows using 'window.canvas' and 'window.plotMarkers', see 'SchmidtPlots'
+    window.schmidtPlots = SchmidtPlots(cycleAnalysis)
+    window.canvas = window.schmidtPlots.canvas
+    window.plotMarkers.extend(window.schmidtPlots.markers)
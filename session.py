@@ -0,0 +1,100 @@
+import threading
+from dataclasses import dataclass, astuple, field
+from typing import Optional
+import numpy as np
+from cache import analysisCache
+from filemanager import checkValues, readFromJSON, writeToJSON
+
+@dataclass(frozen=True)
+class EngineParameters():
+    """
+    Validated input values of an analysis, in the order of 'schmidt.PARAMETER_NAMES'.
+    """
+
+    R: float
+    m: float
+    Th: float
+    Tr: float
+    Tc: float
+    V_cyl: float
+    V_reg: float
+    V_c_avg: float
+    piston_rod_area: float
+    piston_cyl_area: float
+    beta: float
+
+    @classmethod
+    def fromValues(cls, values):
+        """
+        Input: 'values' List of 11 values, either numbers or strings from GUI-input, e.g. from 'filemanager.readFromJSON'
+        Output: 'parameters' EngineParameters, or None if a value is missing or not a finite, non-negative number
+        """
+
+        if len(values) != 11 or not checkValues(values):
+            return None
+
+        return cls(*(float(value) for value in values))
+
+    def values(self):
+        """
+        Output: 'values' List of the 11 values, as used by 'schmidt.schmidtAnalysis'
+        """
+
+        return list(astuple(self))
+
+@dataclass
+class Session():
+    """
+    State passed from window to window: the input values and, once it is calculated, their Schmidt-analysis.
+    The windows share the session in memory, so navigating does not read or write files.
+    """
+
+    parameters: EngineParameters
+    cycleAnalysis: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @classmethod
+    def fromFile(cls, fileName="assets/inputValues.json", cycleAnalysis=None):
+        """
+        Creates a session from input values saved with 'save'.
+        Input: 'fileName' String containing the path of the JSON-file
+        'cycleAnalysis' Matrix of results of the values, or None to calculate it on first use
+        Output: 'session' Session
+        """
+
+        try:
+            parameters = EngineParameters.fromValues(readFromJSON(fileName))
+        except Exception:
+            parameters = None
+
+        if parameters is None:
+            raise Exception("Could not read the input values. Ensure '" + fileName + "' contains valid values, e.g. saved from the state window.")
+
+        return cls(parameters, cycleAnalysis)
+
+    def values(self):
+        return self.parameters.values()
+
+    def analysis(self):
+        """
+        Returns the Schmidt-analysis of the session, calculating it on first use.
+        Output: 'cycleAnalysis' Read-only matrix of results
+        """
+
+        if self.cycleAnalysis is None:
+            self.cycleAnalysis = analysisCache.get(self.values())
+
+        return self.cycleAnalysis
+
+    def save(self, fileName="inputValues"):
+        """
+        Writes the input values to 'assets/<fileName>.json' in a background thread. Only called when the user saves the
+        values, so concurrent instances do not overwrite each other's file while navigating. The windows only read
+        the file when they are opened without a session, see 'fromFile'.
+        Input: 'fileName' String Filename (does not include '.json')
+        Output: 'thread' The thread writing the file
+        """
+
+        thread = threading.Thread(target=writeToJSON, args=(fileName, self.values()))
+        thread.start()
+
+        return thread
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+import numpy as np
+from schmidt import parameterMatrix, RESULT_COLUMNS
+from adiabatic import ADIABATIC_COLUMNS
+
+@dataclass(frozen=True)
+class LossParameters():
+    """
+    Assumptions of the loss corrections of 'simpleAnalysis'. The input-values do not describe the regenerator or
+    the cylinder wall, so typical values are used unless other values are given.
+    """
+
+    speed: float = 600.0                        # Engine speed [rpm]
+    gamma: float = 5/3                          # Ratio of the specific heats of the gas, 5/3 for helium
+    regeneratorEffectiveness: float = 0.95      # Share of the regenerator heat recovered by the matrix
+    regeneratorDrag: float = 500.0              # Pressure drop of the regenerator in dynamic pressures of the gas at piston speed
+    gasConductivity: float = 0.15               # [W/m*K], helium
+    displacerGap: float = 0.001                 # Radial gap between the displacer and the cylinder [m]
+    wallThickness: float = 0.005                # [m]
+    wallConductivity: float = 16.0              # [W/m*K], stainless steel
+
+def cylinderGeometry(parameters):
+    """
+    Returns the bore and stroke of the cylinder, derived from the cylinder area and the swept volume.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    Output: 'bore', 'stroke' Numpy arrays of shape (N,) [m]
+    """
+
+    values = parameterMatrix(parameters).T
+    piston_cyl_area = values[9] * 1e-6     # [m^2]
+
+    return 2 * np.sqrt(piston_cyl_area / np.pi), values[5] * 1e-9 / piston_cyl_area
+
+def baseCycle(parameters, cycleAnalyses):
+    """
+    Extracts the quantities of one cycle used by the loss corrections from the results of a base analysis.
+    The cycle is not integrated again, only the rows of the tables are summed.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    'cycleAnalyses' Numpy array of shape (N, angles, columns) from 'schmidt.schmidtAnalysisBatch' or
+    'adiabatic.adiabaticAnalysisBatch', or a single matrix of either
+    Output: 'cycle' Dict of Numpy arrays of shape (N,) containing the indicated work 'W' and the heat of the heater 'Q_h' [J],
+    the mass of gas passing through the regenerator 'm_r' [kg] and the pressure [Pa], expansion volume [m^3] and
+    its change [m^3] for each step
+    """
+
+    values = parameterMatrix(parameters).T[:, :, np.newaxis]
+    cycleAnalyses = np.asarray(cycleAnalyses)
+    if cycleAnalyses.ndim == 2:
+        cycleAnalyses = cycleAnalyses[np.newaxis]
+
+    V_c = cycleAnalyses[:,:,2] * 1e-9      # [m^3]
+    V_e = cycleAnalyses[:,:,3] * 1e-9      # [m^3]
+
+    if cycleAnalyses.shape[2] == len(RESULT_COLUMNS):
+        # Isothermal: the heater supplies the work of the expansion space
+        P = cycleAnalyses[:,:,6] * 1e6                                  # [Pa]
+        P_step = (P[:,1:] + P[:,:-1]) / 2
+        W_c = np.sum(P_step * np.diff(V_c), axis=1)
+        W_e = np.sum(P_step * np.diff(V_e), axis=1)
+        Q_h = W_e
+        m_e = P * V_e / (values[0] * (273.15 + values[2]))
+    elif cycleAnalyses.shape[2] == len(ADIABATIC_COLUMNS):
+        P = cycleAnalyses[:,:,4] * 1e6                                  # [Pa]
+        P_step = (P[:,1:] + P[:,:-1]) / 2
+        W_c = cycleAnalyses[:,-1,9]
+        W_e = cycleAnalyses[:,-1,10]
+        Q_h = cycleAnalyses[:,-1,13]
+        m_e = cycleAnalyses[:,:,8]
+    else:
+        raise ValueError("The results must be from a Schmidt- or an adiabatic analysis.")
+
+    return {
+        'W': W_c + W_e,
+        'Q_h': Q_h,
+        'm_r': m_e.max(axis=1) - m_e.min(axis=1),
+        'P': P_step,
+        'dV_e': np.diff(V_e),
+    }
+
+def simpleAnalysisBatch(parameters, cycleAnalyses, losses=LossParameters()):
+    """
+    Corrects the results of a Schmidt- or adiabatic analysis for the losses of a real engine, for many configurations at once.
+    - Regenerator ineffectiveness: the heat the matrix does not recover is supplied by the heater.
+    - Pumping: the pressure drop of the gas forced through the regenerator costs work.
+    - Shuttle: the moving displacer carries heat from the hot to the cold side.
+    - Conduction: heat flows from the hot to the cold side through the cylinder wall.
+    The shuttle and conduction losses are heat flows, so they are converted to heat per cycle at the engine speed.
+    Input: 'parameters' Engine configurations, see 'schmidt.parameterMatrix'
+    'cycleAnalyses' Results of the base analysis, see 'baseCycle'. The tables of 'cache.AnalysisCache' or
+    'resultstore.ResultStore' are used as they are.
+    'losses' LossParameters
+    Output: 'performance' Dict of Numpy arrays of shape (N,) containing the work and heat per cycle [J],
+    the shaft power [W] and the efficiency
+    """
+
+    values = parameterMatrix(parameters).T
+    cycle = baseCycle(parameters, cycleAnalyses)
+    bore, stroke = cylinderGeometry(parameters)
+
+    R = values[0]
+    T_h = 273.15 + values[2]
+    T_r = 273.15 + values[3]
+    T_k = 273.15 + values[4]
+    c_p = R * losses.gamma / (losses.gamma - 1)
+    frequency = losses.speed / 60                   # [1/s]
+    omega = 2 * np.pi * frequency                   # [rad/s]
+
+    # Regenerator ineffectiveness
+    Q_regenerator = (1 - losses.regeneratorEffectiveness) * cycle['m_r'] * c_p * (T_h - T_k)
+
+    # Pumping, with the gas passing the cylinder area at the speed of the expansion volume
+    dTheta = 2 * np.pi / cycle['dV_e'].shape[1]
+    area = (np.pi * bore ** 2 / 4)[:, np.newaxis]
+    velocity = omega * np.abs(cycle['dV_e']) / dTheta / area
+    density = cycle['P'] / (R * T_r)[:, np.newaxis]
+    pressureDrop = losses.regeneratorDrag * density * velocity ** 2 / 2
+    W_pumping = np.sum(pressureDrop * np.abs(cycle['dV_e']), axis=1)
+
+    # Shuttle and conduction, with a displacer and a cylinder as long as the bore
+    length = bore
+    Q_shuttle = np.pi * stroke ** 2 * losses.gasConductivity * bore * (T_h - T_k) / (8 * losses.displacerGap * length) / frequency
+    Q_conduction = losses.wallConductivity * np.pi * bore * losses.wallThickness * (T_h - T_k) / length / frequency
+
+    W_shaft = cycle['W'] - W_pumping
+    Q_input = cycle['Q_h'] + Q_regenerator + Q_shuttle + Q_conduction
+
+    return {
+        'W_indicated': cycle['W'],
+        'W_pumping': W_pumping,
+        'W_shaft': W_shaft,
+        'Q_heater': cycle['Q_h'],
+        'Q_regenerator': Q_regenerator,
+        'Q_shuttle': Q_shuttle,
+        'Q_conduction': Q_conduction,
+        'Q_input': Q_input,
+        'power': W_shaft * frequency,
+        'efficiency': W_shaft / Q_input,
+    }
+
+def simpleAnalysis(values, cycleAnalysis, losses=LossParameters()):
+    """
+    Corrects the results of a Schmidt- or adiabatic analysis for losses, see 'simpleAnalysisBatch'.
+    Input: 'values' List of 11 values used for calculation
+    'cycleAnalysis' Matrix of results from 'schmidt.schmidtAnalysis' or 'adiabatic.adiabaticAnalysis'
+    'losses' LossParameters
+    Output: 'performance' Dict of floats, see 'simpleAnalysisBatch'
+    """
+
+    return {name: float(value[0]) for name, value in simpleAnalysisBatch([values], cycleAnalysis, losses).items()}
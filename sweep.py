@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from filemanager import ResultWriter, readFromJSON
+from resultstore import ResultStore
+from schmidt import PARAMETER_NAMES, RESULT_COLUMNS, crankAngles, schmidtAnalysisBatch
+
+def readSweepSpecification(fileName):
+    """
+    Reads a sweep specification from a JSON-file.
+    The specification contains the engine definition used for all inputs that are not swept ('base', a JSON-file in the
+    format of 'assets/default.json', or 'values', a list of 11 values), the crank-angle 'resolution' in degrees,
+    and a 'grid' mapping names from 'schmidt.PARAMETER_NAMES' to either a list of values
+    or a range {"start", "stop", "num"} (both ends included) or {"start", "stop", "step"}.
+    Every combination of the values in the grid is evaluated.
+    Input: 'fileName' String containing the path to the JSON-file
+    Output: 'specification' Dict containing the sweep specification
+    """
+
+    try:
+        with open(fileName) as jsonFile:
+            specification = json.load(jsonFile)
+    except OSError:
+        raise Exception("Could not open file. Ensure filename is correct.")
+
+    sweepAxes(specification)
+
+    return specification
+
+def sweepAxes(specification):
+    """
+    Returns the values of the inputs that are not swept and the values of each swept input.
+    Input: 'specification' Dict containing a sweep specification, see 'readSweepSpecification'
+    Output: 'baseValues' List of 11 values
+    'axes' List of tuples (index in 'schmidt.PARAMETER_NAMES', Numpy array of values)
+    """
+
+    if 'values' in specification:
+        baseValues = [float(value) for value in specification['values']]
+    else:
+        baseValues = readFromJSON(specification.get('base', "assets/default.json"))
+
+    if len(baseValues) != len(PARAMETER_NAMES):
+        raise ValueError("The base engine definition must contain " + str(len(PARAMETER_NAMES)) + " values.")
+
+    axes = []
+    for name, axis in specification.get('grid', {}).items():
+        if name not in PARAMETER_NAMES:
+            raise ValueError("Unknown parameter '" + name + "'. Use one of: " + ", ".join(PARAMETER_NAMES))
+
+        if isinstance(axis, dict) and 'num' in axis:
+            axisValues = np.linspace(axis['start'], axis['stop'], int(axis['num']))
+        elif isinstance(axis, dict) and 'step' in axis:
+            # Includes 'stop' when it lies on the grid
+            count = int(np.floor((axis['stop'] - axis['start']) / axis['step'] + 1e-9)) + 1
+            axisValues = axis['start'] + np.arange(count) * axis['step']
+        else:
+            axisValues = np.atleast_1d(np.asarray(axis, dtype=float))
+
+        if len(axisValues) == 0:
+            raise ValueError("The grid for '" + name + "' contains no values.")
+
+        axes.append((PARAMETER_NAMES.index(name), axisValues))
+
+    return baseValues, axes
+
+def sweepSize(axes):
+    """
+    Returns the number of configurations in a sweep.
+    Input: 'axes' List of swept inputs from 'sweepAxes'
+    Output: 'size' Integer
+    """
+
+    return int(np.prod([len(axisValues) for _, axisValues in axes], dtype=np.int64))
+
+def sweepParameters(baseValues, axes, start, stop):
+    """
+    Returns the configurations with the indices 'start' to 'stop' of a sweep, without building the full grid.
+    Input: 'baseValues' List of 11 values
+    'axes' List of swept inputs from 'sweepAxes'
+    'start', 'stop' Range of configuration-indices
+    Output: 'parameters' Numpy array of shape (stop - start, 11)
+    """
+
+    parameters = np.tile(np.asarray(baseValues, dtype=float), (stop - start, 1))
+
+    if axes:
+        gridIndices = np.unravel_index(np.arange(start, stop), [len(axisValues) for _, axisValues in axes])
+        for (column, axisValues), axisIndices in zip(axes, gridIndices):
+            parameters[:, column] = axisValues[axisIndices]
+
+    return parameters
+
+def evaluateChunk(baseValues, axes, resolution, chunk, start, stop):
+    """
+    Evaluates one chunk of a sweep. Runs in a worker process.
+    Input: 'baseValues', 'axes' The sweep, see 'sweepAxes'
+    'resolution' Step between two crank angles in degrees
+    'chunk' Index of the chunk
+    'start', 'stop' Range of configuration-indices in the chunk
+    Output: 'chunk' Index of the chunk
+    'cycleAnalyses' Numpy array of shape (stop - start, angles, 16)
+    """
+
+    parameters = sweepParameters(baseValues, axes, start, stop)
+
+    return chunk, schmidtAnalysisBatch(parameters, resolution)
+
+def openResults(parametersPath, resultsPath, shape):
+    """
+    Opens the results of an interrupted sweep for writing.
+    Input: 'parametersPath', 'resultsPath' Strings containing the paths of 'parameters.npy' and 'results.npy'
+    'shape' Tuple containing the shape of the results of the sweep
+    Output: 'results' Memory-mapped Numpy array, or None if a file is missing, damaged or from another sweep
+    """
+
+    try:
+        parameters = np.load(parametersPath, mmap_mode='r')
+        results = np.lib.format.open_memmap(resultsPath, mode='r+')
+    except (OSError, ValueError):
+        return None
+
+    if parameters.shape != (shape[0], len(PARAMETER_NAMES)) or results.shape != shape:
+        return None
+
+    return results
+
+def runSweep(specification, outputDirectory, chunkSize=2000, workers=None, resume=False):
+    """
+    Runs a sweep on a process pool and writes the results to 'outputDirectory'.
+    The directory contains 'parameters.npy' (N, 11), 'results.npy' (N, angles, 16), the grid in 'index.json' and
+    'progress.json', which records the completed chunks so that an interrupted sweep can be resumed.
+    Completed sweeps are read with 'resultstore.ResultStore'.
+    Input: 'specification' Dict containing the sweep specification, see 'readSweepSpecification'
+    'outputDirectory' String containing the path of the output directory
+    'chunkSize' Number of configurations evaluated by a worker at a time
+    'workers' Number of worker processes. Defaults to the number of cores.
+    'resume' Boolean, continues an interrupted sweep in 'outputDirectory' when True
+    Output: 'statistics' Dict containing the number of evaluated configurations, the time used and the throughput
+    """
+
+    if chunkSize < 1:
+        raise ValueError("The chunk size must be at least 1 configuration.")
+
+    baseValues, axes = sweepAxes(specification)
+    size = sweepSize(axes)
+    resolution = specification.get('resolution', 10)
+    angles = len(crankAngles(resolution))
+    workers = workers or os.cpu_count() or 1
+    chunks = [(chunk, start, min(start + chunkSize, size)) for chunk, start in enumerate(range(0, size, chunkSize))]
+
+    parametersPath = os.path.join(outputDirectory, "parameters.npy")
+    resultsPath = os.path.join(outputDirectory, "results.npy")
+    progressPath = os.path.join(outputDirectory, "progress.json")
+
+    results = None
+    if resume and os.path.exists(progressPath):
+        with open(progressPath) as progressFile:
+            progress = json.load(progressFile)
+        if progress['specification'] != specification or progress['chunkSize'] != chunkSize:
+            raise Exception("The sweep in '" + outputDirectory + "' was started with another specification or chunk size.")
+        results = openResults(parametersPath, resultsPath, (size, angles, 16))
+        if results is None:
+            print("The sweep in '" + outputDirectory + "' stopped before its files were written. Starting it again.")
+
+    if results is None:
+        os.makedirs(outputDirectory, exist_ok=True)
+        progress = {'specification': specification, 'chunkSize': chunkSize, 'completed': []}
+
+        # Written first, so that the progress of an earlier sweep in the directory does not mark the new results as complete
+        with open(progressPath, 'w') as progressFile:
+            json.dump(progress, progressFile)
+        np.save(parametersPath, sweepParameters(baseValues, axes, 0, size))
+
+        # Side index used by 'resultstore.ResultStore' to find configurations by their input values
+        with open(os.path.join(outputDirectory, "index.json"), 'w') as indexFile:
+            json.dump({
+                'base': [float(value) for value in baseValues],
+                'names': [PARAMETER_NAMES[column] for column, _ in axes],
+                'axes': [axisValues.tolist() for _, axisValues in axes],
+            }, indexFile)
+        results = np.lib.format.open_memmap(resultsPath, mode='w+', dtype=np.float64, shape=(size, angles, 16))
+
+    completed = set(progress['completed'])
+    remaining = [chunk for chunk in chunks if chunk[0] not in completed]
+    evaluated = 0
+    startTime = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Limits the number of chunks in flight, so that memory is bounded by the chunk size
+        maxPending = 2 * workers
+        pending = set()
+        position = 0
+
+        while position < len(remaining) or pending:
+            while position < len(remaining) and len(pending) < maxPending:
+                pending.add(executor.submit(evaluateChunk, baseValues, axes, resolution, *remaining[position]))
+                position += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                chunk, cycleAnalyses = future.result()
+                _, start, stop = chunks[chunk]
+                results[start:stop] = cycleAnalyses
+                results.flush()
+
+                completed.add(chunk)
+                progress['completed'] = sorted(completed)
+                with open(progressPath, 'w') as progressFile:
+                    json.dump(progress, progressFile)
+
+                evaluated += stop - start
+                elapsed = time.perf_counter() - startTime
+                print("Chunk " + str(len(completed)) + "/" + str(len(chunks)) + ": "
+                      + str(round(evaluated / elapsed)) + " configs/s")
+
+    del results
+    elapsed = time.perf_counter() - startTime
+
+    return {
+        'configurations': size,
+        'evaluated': evaluated,
+        'seconds': elapsed,
+        'throughput': evaluated / elapsed if elapsed > 0 else 0.0,
+    }
+
+def exportSweep(outputDirectory, filePath, chunkSize=2000):
+    """
+    Streams the results of a completed sweep to a CSV- or '.npy'-file, see 'filemanager.ResultWriter'.
+    Each row contains the index of the configuration, its 11 input values and one row of its 'schmidtAnalysis'-matrix.
+    Input: 'outputDirectory' String containing the directory of the sweep
+    'filePath' String containing the path of the exported file
+    'chunkSize' Number of configurations held in memory at a time
+    """
+
+    # Opening the store refuses an incomplete sweep
+    store = ResultStore(outputDirectory)
+    parameters = store.parameters
+    results = store.results
+    angles = results.shape[1]
+
+    with ResultWriter(filePath, ["configuration"] + PARAMETER_NAMES + RESULT_COLUMNS) as writer:
+        for start in range(0, len(results), chunkSize):
+            stop = min(start + chunkSize, len(results))
+            configurations = np.repeat(np.arange(start, stop), angles)[:, np.newaxis]
+            inputs = np.repeat(parameters[start:stop], angles, axis=0)
+            writer.write(np.hstack([configurations, inputs, results[start:stop].reshape(-1, results.shape[2])]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs a Schmidt-analysis for every configuration in a parameter sweep.")
+    parser.add_argument("specification", help="JSON-file containing the sweep specification")
+    parser.add_argument("-o", "--output", default="results/sweep", help="directory for the results (default: results/sweep)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=2000, help="configurations per chunk (default: 2000)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("-r", "--resume", action="store_true", help="resume an interrupted sweep in the output directory")
+    parser.add_argument("-e", "--export", default=None, help="also stream the results to this '.csv'- or '.npy'-file")
+    arguments = parser.parse_args(argv)
+
+    specification = readSweepSpecification(arguments.specification)
+    statistics = runSweep(specification, arguments.output, arguments.chunk_size, arguments.workers, arguments.resume)
+
+    print("Evaluated " + str(statistics['evaluated']) + " of " + str(statistics['configurations']) + " configurations in "
+          + str(round(statistics['seconds'], 2)) + " s (" + str(round(statistics['throughput'])) + " configs/s).")
+    print("The results are saved in: " + arguments.output)
+
+    if arguments.export is not None:
+        exportSweep(arguments.output, arguments.export, arguments.chunk_size)
+        print("The results are exported to: " + arguments.export)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import numpy as np
+from filemanager import readFromJSON
+from adiabatic import adiabaticAnalysis, adiabaticAnalysisBatch, adiabaticPerformance
+
+def engineParameters():
+    """
+    Output: 'parameters' Numpy array of shape (4, 11) varying the hot temperature and the phase angle of 'assets/default.json'
+    """
+
+    parameters = np.tile(readFromJSON("assets/default.json"), (4, 1))
+    parameters[:,2] = [100, 300, 500, 700]
+    parameters[:,10] = [90, 120, 150, 100]
+
+    return parameters
+
+def test_energyBalance():
+    # The work of the cycle equals the heat of the cooler, the regenerator and the heater
+    performance = adiabaticPerformance(adiabaticAnalysis(readFromJSON("assets/default.json")))
+    assert abs(performance['W'] - (performance['Q_k'] + performance['Q_r'] + performance['Q_h'])) < 0.1
+
+    performance = adiabaticPerformance(adiabaticAnalysisBatch(engineParameters()))
+    residual = performance['W'] - (performance['Q_k'] + performance['Q_r'] + performance['Q_h'])
+    assert np.all(np.abs(residual) < 1e-5 * np.abs(performance['Q_h']))
+
+def test_efficiencyBelowCarnot():
+    parameters = engineParameters()
+    carnot = 1 - (273.15 + parameters[:,4]) / (273.15 + parameters[:,2])
+
+    for resolution in [10, 1]:
+        performance = adiabaticPerformance(adiabaticAnalysisBatch(parameters, resolution))
+        assert np.all(performance['efficiency'] < carnot)
+
+def test_convergesToFineStep():
+    parameters = engineParameters()
+    reference = adiabaticPerformance(adiabaticAnalysisBatch(parameters, 0.25, tolerance=1e-5, maxStep=0.25))['efficiency']
+
+    # Bounds of the errors stated in the docstring of 'adiabaticAnalysisBatch', with some margin
+    errors = []
+    for resolution, bound in [(10, 5e-3), (5, 1.5e-3), (1, 1e-4)]:
+        efficiency = adiabaticPerformance(adiabaticAnalysisBatch(parameters, resolution))['efficiency']
+        errors.append(np.max(np.abs(efficiency - reference)))
+        assert errors[-1] < bound
+
+    assert errors[0] > errors[1] > errors[2]
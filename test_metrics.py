@@ -0,0 +1,52 @@
+import numpy as np
+from filemanager import readFromJSON
+from metrics import cycleMetrics, cycleMetricsBatch
+from schmidt import schmidtAnalysisBatch
+
+def engineParameters():
+    """
+    Output: 'parameters' Numpy array of shape (50, 11) with random temperatures, phase angles and regenerator volumes
+    around 'assets/default.json'
+    """
+
+    generator = np.random.default_rng(0)
+    parameters = np.tile(readFromJSON("assets/default.json"), (50, 1))
+    parameters[:,2] = generator.uniform(50, 700, 50)
+    parameters[:,10] = generator.uniform(30, 170, 50)
+    parameters[:,6] *= generator.uniform(0.2, 3, 50)
+
+    return parameters
+
+def test_matchesIntegratedTable():
+    # The closed forms agree with a trapezoidal integration of a fine Schmidt-analysis table
+    parameters = engineParameters()
+    metrics = cycleMetricsBatch(parameters)
+    cycleAnalyses = schmidtAnalysisBatch(parameters, samples=3600)
+
+    P = cycleAnalyses[:,:,6]
+    P_step = (P[:,1:] + P[:,:-1]) / 2
+    W_c = np.sum(P_step * np.diff(cycleAnalyses[:,:,2]), axis=1) / 1000
+    W_e = np.sum(P_step * np.diff(cycleAnalyses[:,:,3]), axis=1) / 1000
+    F_r = cycleAnalyses[:,1:,13]
+    F_peak = F_r[np.arange(len(F_r)), np.argmax(np.abs(F_r), axis=1)]
+
+    assert np.allclose(metrics['W_c'], W_c, rtol=1e-5)
+    assert np.allclose(metrics['W_e'], W_e, rtol=1e-5)
+    assert np.allclose(metrics['P_mean'], np.mean(P[:,:-1], axis=1), rtol=1e-9)
+    assert np.allclose(metrics['P_max'], np.max(P, axis=1), rtol=1e-5)
+    assert np.allclose(metrics['P_min'], np.min(P, axis=1), rtol=1e-5)
+    assert np.allclose(metrics['F_peak'], F_peak, rtol=1e-5)
+
+def test_efficiencyIsCarnot():
+    # The isothermal cycle converts the heat of the expansion space with the Carnot efficiency
+    parameters = engineParameters()
+    carnot = 1 - (273.15 + parameters[:,4]) / (273.15 + parameters[:,2])
+
+    assert np.allclose(cycleMetricsBatch(parameters)['efficiency'], carnot, rtol=1e-9)
+
+def test_singleMatchesBatch():
+    values = readFromJSON("assets/default.json")
+    metrics = cycleMetrics(values, speed=1200.0)
+
+    for name, value in cycleMetricsBatch([values], speed=1200.0).items():
+        assert metrics[name] == value[0]